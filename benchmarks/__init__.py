@@ -0,0 +1 @@
+# Benchmarks de desempenho do Database, do importador e dos gráficos
@@ -0,0 +1,44 @@
+import argparse
+import json
+import sys
+
+from .suite import executar, comparar, salvar
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Mede o desempenho das consultas, da importação, da exportação, dos gráficos e da partida da aplicação.'
+    )
+    parser.add_argument('--linhas', type=int, default=10000,
+                        help='transações no ledger sintético (ex.: 1000 a 5000000)')
+    parser.add_argument('--linhas-importacao', type=int, default=5000,
+                        help='linhas dos arquivos .xlsx/.csv importados')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--secoes', nargs='+', choices=['consultas', 'importacao', 'exportacao', 'graficos', 'partida'],
+                        help='executar apenas as seções indicadas')
+    parser.add_argument('--saida', help='arquivo JSON para gravar o resultado (padrão: stdout)')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='aumento relativo da mediana considerado regressão (padrão: 0.2)')
+    args = parser.parse_args()
+
+    resultado = executar(args.linhas, args.linhas_importacao, args.repeticoes, args.secoes)
+
+    if args.saida:
+        salvar(resultado, args.saida)
+    else:
+        json.dump(resultado, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(resultado, base, args.tolerancia)
+        for nome, antes, depois, razao in regressoes:
+            print(f"REGRESSÃO {nome}: {antes * 1000:.2f} ms -> {depois * 1000:.2f} ms ({razao:.2f}x)",
+                  file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import random
+from datetime import date, timedelta
+
+# Descrições típicas por tipo, usadas para dar variedade ao texto
+DESCRICOES = {
+    'entrada': ['Salário', 'Rendimento', 'Transferência recebida', 'Venda', 'Reembolso', 'Pix recebido'],
+    'saida': ['Supermercado', 'Aluguel', 'Combustível', 'Farmácia', 'Restaurante', 'Conta de luz',
+              'Internet', 'Mensalidade', 'Uber', 'Pix enviado', 'Cartão de crédito'],
+}
+
+# Proporção de saídas e parâmetros (mu, sigma) do valor log-normal por tipo
+PROPORCAO_SAIDAS = 0.8
+VALORES = {
+    'entrada': (7.5, 0.9),
+    'saida': (4.3, 1.1),
+}
+
+def gerar_transacoes(categorias, linhas, ano_final=None, anos=5, seed=42):
+    """Gera tuplas (data, descricao, categoria_id, centavos, tipo) com distribuições realistas.
+
+    categorias é um dicionário tipo -> lista de ids. As transações são
+    produzidas sob demanda, então milhões de linhas não ocupam memória.
+    """
+    aleatorio = random.Random(seed)
+    ano_final = ano_final or date.today().year
+    inicio = date(ano_final - anos + 1, 1, 1)
+    dias = (date(ano_final, 12, 31) - inicio).days + 1
+
+    for _ in range(linhas):
+        tipo = 'saida' if aleatorio.random() < PROPORCAO_SAIDAS else 'entrada'
+
+        # Mais movimento nos dias úteis do início do mês
+        dia = inicio + timedelta(days=aleatorio.randrange(dias))
+        if dia.day > 10 and aleatorio.random() < 0.3:
+            dia = dia.replace(day=aleatorio.randint(1, 10))
+
+        mu, sigma = VALORES[tipo]
+        centavos = round(aleatorio.lognormvariate(mu, sigma) * 100)
+
+        descricao = f"{aleatorio.choice(DESCRICOES[tipo])} {aleatorio.randint(1, 999)}"
+        categoria_id = aleatorio.choice(categorias[tipo])
+
+        yield dia.isoformat(), descricao, categoria_id, centavos, tipo
+
+def mapa_categorias(db):
+    """Retorna os ids de categoria agrupados por tipo"""
+    return {tipo: [cat_id for cat_id, _ in db.get_categorias(tipo)] for tipo in ('entrada', 'saida')}
+
+def gerar_ledger(db, linhas, ano_final=None, anos=5, seed=42):
+    """Popula o banco com transações sintéticas e retorna a quantidade inserida"""
+    transacoes = gerar_transacoes(mapa_categorias(db), linhas, ano_final, anos, seed)
+    return db.add_transacoes_bulk(transacoes)
+
+def gerar_planilha(db, caminho, linhas, ano_final=None, anos=5, seed=7):
+    """Grava um arquivo .xlsx ou .csv no formato aceito pelo importador"""
+    import pandas as pd
+
+    nomes = dict(db.get_categorias())
+    registros = [
+        (dia, descricao, nomes[categoria_id], centavos / 100, tipo)
+        for dia, descricao, categoria_id, centavos, tipo
+        in gerar_transacoes(mapa_categorias(db), linhas, ano_final, anos, seed)
+    ]
+    df = pd.DataFrame(registros, columns=['Data', 'Descrição', 'Categoria', 'Valor', 'Tipo'])
+
+    if str(caminho).lower().endswith('.csv'):
+        df.to_csv(caminho, index=False)
+    else:
+        df.to_excel(caminho, index=False)
+    return caminho
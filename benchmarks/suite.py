@@ -0,0 +1,262 @@
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+from database import Database
+from .gerador import gerar_ledger, gerar_planilha
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos cujo tempo de importação (a frio, em um processo novo) é medido
+MODULOS_PARTIDA = ('ui.main_window', 'cli', 'database')
+
+def medir(funcao, repeticoes=5, preparar=None):
+    """Executa funcao várias vezes e retorna os tempos mínimo e mediano em segundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        'min_s': min(tempos),
+        'mediana_s': statistics.median(tempos),
+        'repeticoes': repeticoes,
+    }
+
+def combinacoes_filtros(ano):
+    """Todas as combinações de filtros (mes, ano, tipo) usadas pela interface"""
+    for mes in (None, 6):
+        for ano_filtro in (None, ano):
+            for tipo in (None, 'entrada', 'saida'):
+                yield mes, ano_filtro, tipo
+
+def medir_consultas(db, ano, repeticoes):
+    """Mede as consultas do Database com o cache de resultados vazio"""
+    resultados = {}
+    limpar = db.cache.clear
+
+    for mes, ano_filtro, tipo in combinacoes_filtros(ano):
+        nome = f"get_transacoes[mes={mes},ano={ano_filtro},tipo={tipo}]"
+        resultados[nome] = medir(lambda: db.get_transacoes(mes, ano_filtro, tipo), repeticoes, limpar)
+
+    for ano_filtro in (None, ano):
+        resultados[f"get_transacoes_columnar[ano={ano_filtro}]"] = medir(
+            lambda: db.get_transacoes_columnar(ano=ano_filtro), repeticoes
+        )
+
+    for ano_filtro in (None, ano):
+        resultados[f"get_fluxo_mensal[ano={ano_filtro}]"] = medir(
+            lambda: db.get_fluxo_mensal(ano_filtro), repeticoes, limpar
+        )
+
+    resultados[f"get_saldo_em[{ano}-06-30]"] = medir(
+        lambda: db.get_saldo_em(f"{ano}-06-30"), repeticoes, limpar
+    )
+    resultados["get_saldo_acumulado[tudo]"] = medir(lambda: db.get_saldo_acumulado(), repeticoes, limpar)
+
+    # Termo frequente (varre pelo índice de data) e termo seletivo (parte do índice textual)
+    for termo in ('pix', 'farmacia 42'):
+        resultados[f"buscar_transacoes[{termo}]"] = medir(
+            lambda: db.buscar_transacoes(termo), repeticoes, limpar
+        )
+
+    for mes, ano_filtro in ((None, None), (None, ano), (6, ano)):
+        resultados[f"get_distribuicao_despesas[mes={mes},ano={ano_filtro}]"] = medir(
+            lambda: db.get_distribuicao_despesas(mes, ano_filtro), repeticoes, limpar
+        )
+
+    return resultados
+
+def medir_importacao(diretorio, linhas, repeticoes):
+    """Mede importar_excel sobre arquivos .xlsx e .csv gerados"""
+    from utils.excel_importer import importar_excel
+
+    resultados = {}
+    modelo = Database(os.path.join(diretorio, 'modelo.db'))
+
+    for extensao in ('xlsx', 'csv'):
+        arquivo = gerar_planilha(modelo, os.path.join(diretorio, f'importacao.{extensao}'), linhas)
+        contador = iter(range(repeticoes))
+
+        def importar():
+            # Cada repetição importa para um banco novo
+            db = Database(os.path.join(diretorio, f'importacao_{extensao}_{next(contador)}.db'))
+            try:
+                sucesso, mensagem = importar_excel(arquivo, db)
+                if not sucesso:
+                    raise RuntimeError(mensagem)
+            finally:
+                db.close()
+
+        resultado = medir(importar, repeticoes)
+        resultado['linhas_por_s'] = linhas / resultado['mediana_s']
+        resultados[f"importar_excel[{extensao},linhas={linhas}]"] = resultado
+
+    modelo.close()
+    return resultados
+
+def medir_graficos(db, ano, repeticoes):
+    """Mede os construtores de gráficos de graph_utils no backend Agg"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from utils.graph_utils import criar_grafico_fluxo_mensal, criar_grafico_distribuicao
+
+    dados_fluxo = db.get_fluxo_mensal(ano)
+    dados_dist = db.get_distribuicao_despesas(6, ano)
+
+    fig = Figure(figsize=(6, 4))
+    canvas = FigureCanvasAgg(fig)
+
+    def fluxo():
+        criar_grafico_fluxo_mensal(fig, dados_fluxo, ano)
+        canvas.draw()
+
+    def distribuicao():
+        criar_grafico_distribuicao(fig, dados_dist)
+        canvas.draw()
+
+    # Imagens da interface: desenho com o cache vazio e reexibição de uma visão já vista
+    from utils.chart_render import ChartRenderer
+    renderizador = ChartRenderer(db)
+
+    def imagens():
+        renderizador.png('fluxo', (ano,), (600, 400), dados_fluxo)
+        renderizador.png('distribuicao', (6, ano), (600, 400), dados_dist)
+
+    resultados = {
+        'criar_grafico_fluxo_mensal': medir(fluxo, repeticoes),
+        'criar_grafico_distribuicao': medir(distribuicao, repeticoes),
+        'ChartRenderer.png[sem cache]': medir(imagens, repeticoes, renderizador.cache.clear),
+    }
+    resultados['ChartRenderer.png[cache]'] = medir(imagens, repeticoes)
+    return resultados
+
+def medir_exportacao(db, diretorio, repeticoes):
+    """Mede exportar_transacoes do ledger inteiro em cada formato disponível"""
+    from importlib.util import find_spec
+    from utils.exporter import FORMATOS, exportar_transacoes
+
+    totais = db.get_totais()
+    linhas = totais['qtd_entradas'] + totais['qtd_saidas']
+    resultados = {}
+    for formato in FORMATOS:
+        # Parquet depende do pyarrow, que é opcional
+        if formato == 'parquet' and find_spec('pyarrow') is None:
+            continue
+        arquivo = os.path.join(diretorio, f'exportacao.{formato}')
+
+        def exportar():
+            sucesso, mensagem = exportar_transacoes(db, arquivo, formato=formato)
+            if not sucesso:
+                raise RuntimeError(mensagem)
+
+        resultado = medir(exportar, repeticoes)
+        resultado['linhas_por_s'] = linhas / resultado['mediana_s']
+        resultados[f"exportar_transacoes[{formato}]"] = resultado
+    return resultados
+
+def tempos_de_importacao(modulo):
+    """Importa o módulo em um processo novo com -X importtime.
+
+    Retorna o tempo cumulativo do módulo em segundos e a lista
+    (módulo, segundos) das dependências, do maior tempo próprio ao menor.
+    """
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    total = None
+    proprios = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, cumulativo, nome = linha[len('import time:'):].split('|')
+        nome = nome.strip()
+        proprios.append((nome, int(proprio) / 1e6))
+        if nome == modulo:
+            total = int(cumulativo) / 1e6
+    proprios.sort(key=lambda item: item[1], reverse=True)
+    return total, proprios
+
+def medir_partida(repeticoes, mais_lentos=10):
+    """Mede o tempo de importação dos módulos de entrada da aplicação"""
+    resultados = {}
+    for modulo in MODULOS_PARTIDA:
+        tempos = []
+        for _ in range(repeticoes):
+            total, proprios = tempos_de_importacao(modulo)
+            tempos.append(total)
+        resultados[f"importtime[{modulo}]"] = {
+            'min_s': min(tempos),
+            'mediana_s': statistics.median(tempos),
+            'repeticoes': repeticoes,
+            'mais_lentos': [{'modulo': nome, 'proprio_s': segundos} for nome, segundos in proprios[:mais_lentos]],
+        }
+    return resultados
+
+def executar(linhas=10000, linhas_importacao=5000, repeticoes=5, secoes=None):
+    """Gera um ledger sintético em um arquivo temporário e executa as medições"""
+    secoes = secoes or ('consultas', 'importacao', 'exportacao', 'graficos', 'partida')
+    ano = date.today().year - 1
+    resultados = {}
+
+    with tempfile.TemporaryDirectory(prefix='fluxo_bench_') as diretorio:
+        db = Database(os.path.join(diretorio, 'ledger.db'))
+        try:
+            inicio = time.perf_counter()
+            gerar_ledger(db, linhas, ano_final=ano)
+            geracao_s = time.perf_counter() - inicio
+
+            if 'consultas' in secoes:
+                resultados.update(medir_consultas(db, ano, repeticoes))
+            if 'importacao' in secoes:
+                resultados.update(medir_importacao(diretorio, linhas_importacao, repeticoes))
+            if 'exportacao' in secoes:
+                resultados.update(medir_exportacao(db, diretorio, repeticoes))
+            if 'graficos' in secoes:
+                resultados.update(medir_graficos(db, ano, repeticoes))
+            if 'partida' in secoes:
+                resultados.update(medir_partida(repeticoes))
+        finally:
+            db.close()
+
+    return {
+        'meta': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'linhas': linhas,
+            'linhas_importacao': linhas_importacao,
+            'geracao_s': geracao_s,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+        },
+        'resultados': resultados,
+    }
+
+def comparar(atual, base, tolerancia=0.2):
+    """Retorna as medições que ficaram mais lentas que a base além da tolerância"""
+    regressoes = []
+    for nome, medicao in atual['resultados'].items():
+        anterior = base['resultados'].get(nome)
+        if not anterior:
+            continue
+        razao = medicao['mediana_s'] / anterior['mediana_s'] if anterior['mediana_s'] else 1.0
+        if razao > 1 + tolerancia:
+            regressoes.append((nome, anterior['mediana_s'], medicao['mediana_s'], razao))
+    return regressoes
+
+def salvar(resultado, caminho):
+    """Grava o resultado em JSON"""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
@@ -0,0 +1,211 @@
+"""Interface de linha de comando, sem Tk nem matplotlib.
+
+Uso: python -m cli [--banco CAMINHO] [--json] COMANDO ...
+
+Importa apenas o Database na partida; pandas só é carregado pelo comando
+importar, de modo que consultas em scripts e tarefas agendadas respondem
+rapidamente.
+"""
+import argparse
+import json
+import os
+import sys
+
+from database import Database
+from utils.moeda import formatar, de_centavos
+
+def imprimir_tabela(cabecalho, linhas):
+    """Imprime linhas alinhadas em colunas"""
+    linhas = [[str(celula) for celula in linha] for linha in linhas]
+    larguras = [max(len(str(c)) for c in coluna) for coluna in zip(cabecalho, *linhas)]
+    for linha in [cabecalho] + linhas:
+        print('  '.join(str(celula).ljust(largura) for celula, largura in zip(linha, larguras)).rstrip())
+
+def imprimir_json(dados):
+    json.dump(dados, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+def comando_importar(db, args):
+    """Importa um ou mais arquivos (ou diretórios)"""
+    from utils.import_pipeline import importar_arquivo, importar_arquivos
+
+    duplicadas = None if args.duplicadas == 'inserir' else args.duplicadas
+    if len(args.arquivos) == 1 and not os.path.isdir(args.arquivos[0]):
+        sucesso, mensagem = importar_arquivo(args.arquivos[0], db, formato=args.formato,
+                                             duplicadas=duplicadas)
+    else:
+        sucesso, mensagem = importar_arquivos(args.arquivos, db, max_workers=args.workers,
+                                              duplicadas=duplicadas)
+
+    print(mensagem, file=sys.stdout if sucesso else sys.stderr)
+    return 0 if sucesso else 1
+
+def comando_resumo(db, args):
+    """Exibe entradas, saídas e saldo do período"""
+    totais = db.get_totais(args.mes, args.ano, args.tipo)
+    if args.json:
+        imprimir_json({chave: de_centavos(valor) if chave in ('entradas', 'saidas', 'saldo') else valor
+                       for chave, valor in totais.items()})
+    else:
+        imprimir_tabela(['', 'Valor', 'Quantidade'], [
+            ['Entradas', formatar(totais['entradas']), totais['qtd_entradas']],
+            ['Saídas', formatar(totais['saidas']), totais['qtd_saidas']],
+            ['Saldo', formatar(totais['saldo']), ''],
+        ])
+    return 0
+
+def comando_fluxo(db, args):
+    """Exibe o fluxo de caixa mensal"""
+    fluxo = sorted(db.get_fluxo_mensal(args.ano))
+    if args.json:
+        imprimir_json([{'mes': mes, 'entradas': de_centavos(entradas), 'saidas': de_centavos(saidas),
+                        'saldo': de_centavos(entradas - saidas)}
+                       for mes, entradas, saidas in fluxo])
+    else:
+        imprimir_tabela(['Mês', 'Entradas', 'Saídas', 'Saldo'], [
+            [mes, formatar(entradas), formatar(saidas), formatar(entradas - saidas)]
+            for mes, entradas, saidas in fluxo
+        ])
+    return 0
+
+def comando_distribuicao(db, args):
+    """Exibe a distribuição de despesas por categoria"""
+    distribuicao = sorted(db.get_distribuicao_despesas(args.mes, args.ano), key=lambda d: -d[1])
+    total = sum(valor for _, valor in distribuicao)
+    if args.json:
+        imprimir_json([{'categoria': categoria, 'total': de_centavos(valor)} for categoria, valor in distribuicao])
+    else:
+        imprimir_tabela(['Categoria', 'Total', '%'], [
+            [categoria, formatar(valor), f"{100 * valor / total:.1f}" if total else '0.0']
+            for categoria, valor in distribuicao
+        ])
+    return 0
+
+def comando_saldo(db, args):
+    """Exibe o saldo em uma data ou a curva de saldo acumulado de um intervalo"""
+    if args.em:
+        saldo = db.get_saldo_em(args.em)
+        if args.json:
+            imprimir_json({'data': args.em, 'saldo': de_centavos(saldo)})
+        else:
+            print(f"Saldo em {args.em}: {formatar(saldo)}")
+        return 0
+
+    curva = db.get_saldo_acumulado(args.inicio, args.fim)
+    if args.json:
+        imprimir_json([{'dia': dia, 'saldo': de_centavos(saldo)} for dia, saldo in curva])
+    else:
+        imprimir_tabela(['Dia', 'Saldo'], [[dia, formatar(saldo)] for dia, saldo in curva])
+    return 0
+
+def comando_buscar(db, args):
+    """Lista as transações cuja descrição contém os termos buscados"""
+    transacoes = db.buscar_transacoes(' '.join(args.termos), args.mes, args.ano, args.tipo, args.limite)
+    if args.json:
+        imprimir_json([{'id': id, 'data': data, 'descricao': descricao, 'categoria': categoria,
+                        'valor': de_centavos(valor), 'tipo': tipo}
+                       for id, data, descricao, categoria, valor, tipo in transacoes])
+    else:
+        imprimir_tabela(['Data', 'Descrição', 'Categoria', 'Valor', 'Tipo'], [
+            [data, descricao, categoria, formatar(valor), tipo]
+            for _, data, descricao, categoria, valor, tipo in transacoes
+        ])
+    return 0
+
+def comando_graficos(db, args):
+    """Gera os gráficos mensais do ano de um ou mais bancos, em paralelo"""
+    from utils.chart_render import exportar_pacotes
+
+    sucesso, mensagem = exportar_pacotes(args.bancos or [args.banco], args.ano, args.destino, args.formato,
+                                         max_workers=args.workers)
+    print(mensagem, file=sys.stdout if sucesso else sys.stderr)
+    return 0 if sucesso else 1
+
+def comando_exportar(db, args):
+    """Exporta as transações do período no formato aceito pelo importador"""
+    from utils.exporter import exportar_transacoes
+
+    sucesso, mensagem = exportar_transacoes(db, args.saida, args.mes, args.ano, args.tipo, formato=args.formato)
+    print(mensagem, file=sys.stdout if sucesso else sys.stderr)
+    return 0 if sucesso else 1
+
+def adicionar_periodo(parser, tipo=True):
+    parser.add_argument('--mes', type=int, choices=range(1, 13), metavar='MES')
+    parser.add_argument('--ano', type=int)
+    if tipo:
+        parser.add_argument('--tipo', choices=['entrada', 'saida'])
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m cli',
+        description='Consultas e importações do Fluxo de Caixa sem a interface gráfica.'
+    )
+    parser.add_argument('--banco', default=os.path.join('data', 'fluxo_caixa.db'),
+                        help='arquivo do banco de dados (padrão: data/fluxo_caixa.db)')
+    parser.add_argument('--json', action='store_true', help='emitir o resultado em JSON')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    importar = comandos.add_parser('importar', aliases=['import'], help='importar arquivos')
+    importar.add_argument('arquivos', nargs='+', help='arquivos ou diretórios a importar')
+    importar.add_argument('--formato', choices=['excel', 'csv', 'ofx', 'qif'],
+                          help='formato do arquivo (padrão: pela extensão)')
+    importar.add_argument('--duplicadas', choices=['ignorar', 'atualizar', 'inserir'], default='ignorar',
+                          help='o que fazer com linhas já importadas (padrão: ignorar)')
+    importar.add_argument('--workers', type=int, help='processos de leitura ao importar vários arquivos')
+    importar.set_defaults(funcao=comando_importar)
+
+    resumo = comandos.add_parser('resumo', aliases=['summary'], help='entradas, saídas e saldo')
+    adicionar_periodo(resumo)
+    resumo.set_defaults(funcao=comando_resumo)
+
+    fluxo = comandos.add_parser('fluxo', aliases=['flow'], help='fluxo de caixa mensal')
+    fluxo.add_argument('--ano', type=int)
+    fluxo.set_defaults(funcao=comando_fluxo)
+
+    distribuicao = comandos.add_parser('distribuicao', aliases=['distribution'],
+                                       help='despesas por categoria')
+    adicionar_periodo(distribuicao, tipo=False)
+    distribuicao.set_defaults(funcao=comando_distribuicao)
+
+    saldo = comandos.add_parser('saldo', aliases=['balance'], help='saldo acumulado')
+    saldo.add_argument('--em', metavar='AAAA-MM-DD', help='saldo ao fim do dia informado')
+    saldo.add_argument('--inicio', metavar='AAAA-MM-DD', help='início da curva de saldo')
+    saldo.add_argument('--fim', metavar='AAAA-MM-DD', help='fim da curva de saldo')
+    saldo.set_defaults(funcao=comando_saldo)
+
+    buscar = comandos.add_parser('buscar', aliases=['search'], help='buscar transações pela descrição')
+    buscar.add_argument('termos', nargs='+', help='palavras (ou prefixos) da descrição')
+    adicionar_periodo(buscar)
+    buscar.add_argument('--limite', type=int, default=50, help='máximo de resultados (padrão: 50)')
+    buscar.set_defaults(funcao=comando_buscar)
+
+    graficos = comandos.add_parser('graficos', aliases=['charts'],
+                                   help='gerar os gráficos de cada mês do ano em arquivos')
+    graficos.add_argument('destino', help='diretório de saída')
+    graficos.add_argument('--ano', type=int, required=True)
+    graficos.add_argument('--formato', choices=['png', 'svg', 'pdf'], default='png')
+    graficos.add_argument('--bancos', nargs='+', metavar='BANCO',
+                          help='bancos de dados a incluir (padrão: o de --banco)')
+    graficos.add_argument('--workers', type=int, help='processos de desenho')
+    graficos.set_defaults(funcao=comando_graficos)
+
+    exportar = comandos.add_parser('exportar', aliases=['export'],
+                                   help='exportar transações para CSV, XLSX ou Parquet')
+    exportar.add_argument('saida', help='arquivo de saída')
+    exportar.add_argument('--formato', choices=['csv', 'xlsx', 'parquet'],
+                          help='formato do arquivo (padrão: pela extensão)')
+    adicionar_periodo(exportar)
+    exportar.set_defaults(funcao=comando_exportar)
+
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    db = Database(args.banco)
+    try:
+        return args.funcao(db, args)
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
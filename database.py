@@ -1,107 +1,832 @@
 import sqlite3
 import os
+import sys
+import threading
+import functools
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 
+class ConnectionManager:
+    """Mantém uma conexão SQLite persistente por thread"""
+
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -20000",
+        "PRAGMA mmap_size = 268435456",
+        "PRAGMA busy_timeout = 5000",
+    )
+
+    def __init__(self, db_path, ao_confirmar=None, antes_de_confirmar=None):
+        self.db_path = db_path
+        self.ao_confirmar = ao_confirmar
+        self.antes_de_confirmar = antes_de_confirmar
+        self._conexoes = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def get_connection(self):
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada"""
+        thread_id = threading.get_ident()
+        conn = self._conexoes.get(thread_id)
+        if conn is None:
+            # isolation_level=None: as transações são controladas por transacao()
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            self._local.data_version = None
+            with self._lock:
+                self._conexoes[thread_id] = conn
+        return conn
+
+    @contextmanager
+    def transacao(self):
+        """Executa o bloco em uma transação; blocos aninhados participam da externa.
+
+        Savepoints não são usados porque, com os gatilhos de resumo_mensal,
+        cada inserção dentro de um savepoint fica mais lenta conforme a
+        tabela cresce. Um erro em um bloco aninhado desfaz a transação
+        inteira, mesmo que seja tratado por quem o chamou: a transação
+        externa é desfeita e termina com sqlite3.OperationalError.
+        """
+        conn = self.get_connection()
+        profundidade = getattr(self._local, 'profundidade', 0)
+
+        if profundidade:
+            self._local.profundidade = profundidade + 1
+            try:
+                yield conn.cursor()
+            except BaseException:
+                # As escritas parciais deste bloco não podem ser confirmadas
+                self._local.somente_desfazer = True
+                raise
+            finally:
+                self._local.profundidade = profundidade
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.profundidade = 1
+        self._local.somente_desfazer = False
+        try:
+            yield conn.cursor()
+            if self._local.somente_desfazer:
+                raise sqlite3.OperationalError("Transação desfeita por um erro em um bloco aninhado")
+            if self.antes_de_confirmar:
+                self.antes_de_confirmar()
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+            if self.ao_confirmar:
+                self.ao_confirmar()
+        finally:
+            self._local.profundidade = 0
+            self._local.somente_desfazer = False
+
+    def alterado_externamente(self):
+        """Indica se outra conexão confirmou escritas desde a última chamada nesta thread.
+
+        PRAGMA data_version muda quando outra conexão (outra thread ou outro
+        processo, como a CLI) grava no banco; a primeira chamada em uma
+        conexão só registra o valor.
+        """
+        versao = self.get_connection().execute("PRAGMA data_version").fetchone()[0]
+        anterior = self._local.data_version
+        self._local.data_version = versao
+        return anterior is not None and versao != anterior
+
+    def em_transacao(self):
+        """Indica se a thread atual está dentro de transacao()"""
+        return getattr(self._local, 'profundidade', 0) > 0
+
+    def close(self):
+        """Fecha a conexão da thread atual e as de threads já encerradas.
+
+        Threads ainda ativas podem estar no meio de uma consulta (tarefas
+        em segundo plano da interface): suas conexões ficam abertas e são
+        liberadas com o processo.
+        """
+        atual = threading.get_ident()
+        ativas = {thread.ident for thread in threading.enumerate()}
+        with self._lock:
+            ids = [thread_id for thread_id in self._conexoes if thread_id == atual or thread_id not in ativas]
+            conexoes = [self._conexoes.pop(thread_id) for thread_id in ids]
+        for conn in conexoes:
+            conn.close()
+
+_AUSENTE = object()
+
+def hash_transacao(data, descricao, centavos, tipo, ocorrencia=0):
+    """Impressão digital do conteúdo de uma transação importada.
+
+    ocorrencia numera linhas idênticas dentro da mesma importação, para que
+    lançamentos legitimamente repetidos não sejam tratados como duplicatas.
+    """
+    chave = f"{data}|{str(descricao).strip()}|{int(centavos)}|{tipo}|{ocorrencia}"
+    return hashlib.blake2b(chave.encode('utf-8'), digest_size=16).digest()
+
+
+def _estimar_tamanho(resultado):
+    """Estima em bytes a memória ocupada por um resultado de consulta"""
+    if isinstance(resultado, dict):
+        return sys.getsizeof(resultado) + sum(sys.getsizeof(v) for v in resultado.values())
+    if not isinstance(resultado, list):
+        return sys.getsizeof(resultado)
+    tamanho = sys.getsizeof(resultado)
+    for linha in resultado:
+        tamanho += sys.getsizeof(linha) + sum(sys.getsizeof(v) for v in linha)
+    return tamanho
+
+class ResultCache:
+    """Cache LRU de resultados de consultas, limitado em entradas e em bytes"""
+
+    def __init__(self, max_entradas=256, max_bytes=32 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.descartes = 0
+
+    def get(self, chave):
+        """Retorna o resultado guardado ou _AUSENTE"""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.misses += 1
+                return _AUSENTE
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item[0]
+
+    def put(self, chave, resultado):
+        """Guarda um resultado, descartando os menos usados se preciso"""
+        tamanho = _estimar_tamanho(resultado)
+        if tamanho > self.max_bytes:
+            return
+
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            self._itens[chave] = (resultado, tamanho)
+            self._bytes += tamanho
+
+            while len(self._itens) > self.max_entradas or self._bytes > self.max_bytes:
+                _, (_, tamanho_removido) = self._itens.popitem(last=False)
+                self._bytes -= tamanho_removido
+                self.descartes += 1
+
+    def clear(self):
+        """Remove todos os resultados guardados"""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Retorna as estatísticas de uso do cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'taxa_acerto': self.hits / total if total else 0.0,
+                'descartes': self.descartes,
+                'entradas': len(self._itens),
+                'bytes': self._bytes,
+            }
+
+class CategoryIndex:
+    """Índice em memória das categorias, por (tipo, nome) e por id.
+
+    Carregado com uma única consulta no primeiro uso e invalidado pelas
+    escritas em categorias do Database.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._por_chave = None
+        self._por_id = None
+
+    def _carregar(self):
+        """Retorna os dicionários (por_chave, por_id), consultando o banco se preciso"""
+        with self._lock:
+            if self._por_id is not None:
+                return self._por_chave, self._por_id
+
+            cursor = self.db._cursor()
+            cursor.execute("SELECT id, nome, tipo FROM categorias ORDER BY id")
+            por_chave = {}
+            por_id = {}
+            for cat_id, nome, tipo in cursor.fetchall():
+                por_id[cat_id] = (nome, tipo)
+                por_chave.setdefault((tipo, nome), cat_id)
+
+            # Dentro de uma transação o resultado pode ainda ser desfeito
+            if not self.db.conexoes.em_transacao():
+                self._por_chave, self._por_id = por_chave, por_id
+            return por_chave, por_id
+
+    def invalidar(self):
+        """Descarta o índice para que seja recarregado no próximo uso"""
+        with self._lock:
+            self._por_chave = None
+            self._por_id = None
+
+    def id(self, tipo, nome):
+        """Retorna o id da categoria pelo tipo e nome, ou None"""
+        return self._carregar()[0].get((tipo, nome))
+
+    def nome(self, categoria_id):
+        """Retorna o nome da categoria pelo id, ou None"""
+        categoria = self._carregar()[1].get(categoria_id)
+        return categoria[0] if categoria else None
+
+    def listar(self, tipo=None):
+        """Retorna (id, nome) de todas as categorias ou apenas as de um tipo"""
+        return [
+            (cat_id, nome) for cat_id, (nome, tipo_cat) in self._carregar()[1].items()
+            if tipo is None or tipo_cat == tipo
+        ]
+
+    def mapa(self):
+        """Retorna uma cópia do mapa (tipo, nome) -> id"""
+        return dict(self._carregar()[0])
+
+def _cacheado(metodo):
+    """Guarda o resultado de um método de leitura em Database.cache.
+
+    A chave inclui a versão dos dados, de modo que qualquer escrita
+    confirmada, desta instância ou de outro processo, torna os resultados
+    anteriores inacessíveis.
+    """
+    @functools.wraps(metodo)
+    def wrapper(self, *args, **kwargs):
+        # Leituras dentro de uma transação podem ver dados ainda não confirmados
+        if self.conexoes.em_transacao():
+            return metodo(self, *args, **kwargs)
+
+        chave = (metodo.__name__, self.versao(), args, tuple(sorted(kwargs.items())))
+        resultado = self.cache.get(chave)
+        if resultado is _AUSENTE:
+            resultado = metodo(self, *args, **kwargs)
+            self.cache.put(chave, resultado)
+
+        # Devolver uma cópia rasa para que o chamador não altere o cache
+        if isinstance(resultado, dict):
+            return dict(resultado)
+        if isinstance(resultado, list):
+            return list(resultado)
+        return resultado
+    return wrapper
+
+def _filtro_periodo(coluna, mes=None, ano=None):
+    """Monta o filtro de mês/ano como intervalo de datas, aproveitando os índices em data"""
+    if ano:
+        ano = int(ano)
+        if mes:
+            mes = int(mes)
+            inicio = f"{ano:04d}-{mes:02d}-01"
+            fim = f"{ano + 1:04d}-01-01" if mes == 12 else f"{ano:04d}-{mes + 1:02d}-01"
+        else:
+            inicio = f"{ano:04d}-01-01"
+            fim = f"{ano + 1:04d}-01-01"
+        return f" AND {coluna} >= ? AND {coluna} < ?", [inicio, fim]
+
+    if mes:
+        # Mês sem ano não forma um intervalo contínuo
+        return f" AND strftime('%m', {coluna}) = ?", [f"{int(mes):02d}"]
+
+    return "", []
+
+def _filtro_resumo(mes=None, ano=None):
+    """Monta o filtro de mês/ano sobre a chave 'AAAA-MM' de resumo_mensal"""
+    if ano:
+        ano = int(ano)
+        if mes:
+            return " AND r.mes = ?", [f"{ano:04d}-{int(mes):02d}"]
+        return " AND r.mes >= ? AND r.mes < ?", [f"{ano:04d}-01", f"{ano + 1:04d}-01"]
+
+    if mes:
+        return " AND substr(r.mes, 6, 2) = ?", [f"{int(mes):02d}"]
+
+    return "", []
+
 class Database:
-    def __init__(self):
-        self.db_path = os.path.join('data', 'fluxo_caixa.db')
+    # Migrações de esquema, aplicadas em ordem conforme PRAGMA user_version
+    MIGRACOES = (
+        '_migracao_indices_data',
+        '_migracao_resumo_mensal',
+        '_migracao_hash_transacoes',
+        '_migracao_valor_centavos',
+        '_migracao_saldo_diario',
+        '_migracao_busca_textual',
+        '_migracao_hash_manuais',
+    )
+
+    # A partir de quantos resultados a busca textual percorre o índice de data
+    LIMIAR_BUSCA_AMPLA = 2000
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join('data', 'fluxo_caixa.db')
+        self.versao_dados = 0
+        self.busca_textual = False
+        self.cache = ResultCache()
+        self.categorias = CategoryIndex(self)
+        self._pendencias = threading.local()
+        self.conexoes = ConnectionManager(self.db_path, ao_confirmar=self._invalidar_cache,
+                                          antes_de_confirmar=self._antes_de_confirmar)
         self.setup_database()
 
+    def transacao(self):
+        """Context manager para agrupar operações em uma única transação"""
+        return self.conexoes.transacao()
+
+    def _cursor(self):
+        """Retorna um cursor na conexão persistente da thread atual"""
+        return self.conexoes.get_connection().cursor()
+
+    def close(self):
+        """Fecha as conexões com o banco de dados"""
+        self.conexoes.close()
+
+    def _marcar_saldo_pendente(self):
+        """Pede a atualização de saldo_diario ao confirmar a transação em curso"""
+        self._pendencias.saldo = True
+
+    def _antes_de_confirmar(self):
+        """Repõe os saldos diários apagados pelos gatilhos, uma vez por transação.
+
+        Executado dentro da transação mais externa, antes do COMMIT: uma
+        importação em lotes recalcula os saldos uma única vez, ao fim.
+        """
+        if getattr(self._pendencias, 'saldo', False):
+            self._pendencias.saldo = False
+            self.atualizar_saldo_diario()
+
+    def versao(self):
+        """Retorna a versão dos dados, avançando-a se outro processo gravou no banco"""
+        if self.conexoes.alterado_externamente():
+            self._invalidar_cache()
+        return self.versao_dados
+
+    def _invalidar_cache(self):
+        """Avança a versão dos dados após uma escrita confirmada"""
+        self.versao_dados += 1
+        self.cache.clear()
+
+    def get_cache_stats(self):
+        """Retorna as estatísticas do cache de consultas"""
+        stats = self.cache.stats()
+        stats['versao_dados'] = self.versao_dados
+        return stats
+
     def setup_database(self):
         """Configura o banco de dados e cria as tabelas necessárias"""
-        if not os.path.exists('data'):
-            os.makedirs('data')
+        diretorio = os.path.dirname(self.db_path)
+        if diretorio and not os.path.exists(diretorio):
+            os.makedirs(diretorio)
+
+        with self.transacao() as cursor:
+            # Criar tabela de categorias
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS categorias (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nome TEXT NOT NULL,
+                    tipo TEXT NOT NULL
+                )
+            ''')
+
+            # Criar tabela de transações (valor passa a centavos em _migracao_valor_centavos)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS transacoes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    data DATE NOT NULL,
+                    descricao TEXT NOT NULL,
+                    categoria_id INTEGER,
+                    valor REAL NOT NULL,
+                    tipo TEXT NOT NULL,
+                    FOREIGN KEY (categoria_id) REFERENCES categorias (id)
+                )
+            ''')
+
+            # Inserir categorias padrão se não existirem
+            cursor.execute("SELECT COUNT(*) FROM categorias")
+            if cursor.fetchone()[0] == 0:
+                categorias_padrao = [
+                    ('Salário', 'entrada'),
+                    ('Investimentos', 'entrada'),
+                    ('Outros', 'entrada'),
+                    ('Alimentação', 'saida'),
+                    ('Moradia', 'saida'),
+                    ('Transporte', 'saida'),
+                    ('Saúde', 'saida'),
+                    ('Educação', 'saida'),
+                    ('Lazer', 'saida'),
+                    ('Outros', 'saida')
+                ]
+                cursor.executemany("INSERT INTO categorias (nome, tipo) VALUES (?, ?)", categorias_padrao)
+
+            self._migrar(cursor)
+
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'transacoes_fts'")
+            self.busca_textual = cursor.fetchone() is not None
+
+    def _migrar(self, cursor):
+        """Aplica as migrações de esquema ainda não executadas neste banco"""
+        cursor.execute("PRAGMA user_version")
+        versao = cursor.fetchone()[0]
+
+        for numero, nome in enumerate(self.MIGRACOES, start=1):
+            if numero > versao:
+                getattr(self, nome)(cursor)
+                cursor.execute(f"PRAGMA user_version = {numero}")
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _migracao_indices_data(self, cursor):
+        """Cria os índices usados pelos filtros por período"""
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_data ON transacoes (data)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_tipo_data ON transacoes (tipo, data)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_categoria_data ON transacoes (categoria_id, data)")
 
-        # Criar tabela de categorias
+    def _migracao_resumo_mensal(self, cursor):
+        """Cria a tabela resumo_mensal e os gatilhos que a mantêm sincronizada"""
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categorias (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL,
-                tipo TEXT NOT NULL
-            )
+            CREATE TABLE IF NOT EXISTS resumo_mensal (
+                mes TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                categoria_id INTEGER NOT NULL,
+                total REAL NOT NULL DEFAULT 0,
+                quantidade INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (mes, tipo, categoria_id)
+            ) WITHOUT ROWID
         ''')
 
-        # Criar tabela de transações
+        self._criar_gatilhos_resumo(cursor)
+        self.reconstruir_resumo_mensal()
+
+    def _criar_gatilhos_resumo(self, cursor):
+        """Cria os gatilhos que mantêm resumo_mensal sincronizado com transacoes"""
+        # Transações sem categoria são agregadas em categoria_id = 0
+        somar = '''
+            INSERT INTO resumo_mensal (mes, tipo, categoria_id, total, quantidade)
+            VALUES (strftime('%Y-%m', NEW.data), NEW.tipo, COALESCE(NEW.categoria_id, 0), NEW.valor, 1)
+            ON CONFLICT (mes, tipo, categoria_id)
+            DO UPDATE SET total = total + excluded.total, quantidade = quantidade + 1;
+        '''
+        subtrair = '''
+            UPDATE resumo_mensal
+            SET total = total - OLD.valor, quantidade = quantidade - 1
+            WHERE mes = strftime('%Y-%m', OLD.data) AND tipo = OLD.tipo
+              AND categoria_id = COALESCE(OLD.categoria_id, 0);
+            DELETE FROM resumo_mensal
+            WHERE mes = strftime('%Y-%m', OLD.data) AND tipo = OLD.tipo
+              AND categoria_id = COALESCE(OLD.categoria_id, 0) AND quantidade <= 0;
+        '''
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_resumo_insert AFTER INSERT ON transacoes
+            BEGIN {somar} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_resumo_delete AFTER DELETE ON transacoes
+            BEGIN {subtrair} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_resumo_update
+            AFTER UPDATE OF data, categoria_id, valor, tipo ON transacoes
+            BEGIN {subtrair} {somar} END
+        """)
+
+    def _migracao_hash_transacoes(self, cursor):
+        """Adiciona a coluna hash, preenche as transações existentes e cria o índice único"""
+        cursor.execute("ALTER TABLE transacoes ADD COLUMN hash BLOB")
+
+        ocorrencias = {}
+        hashes = []
+        for transacao_id, data, descricao, valor, tipo in self.conexoes.get_connection().execute(
+            "SELECT id, data, descricao, valor, tipo FROM transacoes ORDER BY id"
+        ):
+            # Nesta versão do esquema valor ainda está em reais
+            centavos = round(valor * 100)
+            chave = (data, descricao, centavos, tipo)
+            ocorrencia = ocorrencias.get(chave, 0)
+            ocorrencias[chave] = ocorrencia + 1
+            hashes.append((hash_transacao(data, descricao, centavos, tipo, ocorrencia), transacao_id))
+
+        cursor.executemany("UPDATE transacoes SET hash = ? WHERE id = ?", hashes)
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transacoes_hash ON transacoes (hash)")
+
+    def _migracao_valor_centavos(self, cursor):
+        """Passa transacoes.valor e resumo_mensal.total de REAL (reais) para INTEGER (centavos).
+
+        SQLite não altera o tipo de uma coluna: a tabela é recriada e os
+        índices, gatilhos e o resumo mensal são refeitos.
+        """
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transacoes (
+            CREATE TABLE transacoes_nova (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 data DATE NOT NULL,
                 descricao TEXT NOT NULL,
                 categoria_id INTEGER,
-                valor REAL NOT NULL,
+                valor INTEGER NOT NULL,
                 tipo TEXT NOT NULL,
+                hash BLOB,
                 FOREIGN KEY (categoria_id) REFERENCES categorias (id)
             )
         ''')
+        cursor.execute("""
+            INSERT INTO transacoes_nova (id, data, descricao, categoria_id, valor, tipo, hash)
+            SELECT id, data, descricao, categoria_id, CAST(ROUND(valor * 100) AS INTEGER), tipo, hash
+            FROM transacoes
+        """)
+        cursor.execute("DROP TABLE transacoes")
+        cursor.execute("ALTER TABLE transacoes_nova RENAME TO transacoes")
+
+        self._migracao_indices_data(cursor)
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transacoes_hash ON transacoes (hash)")
+
+        cursor.execute("DROP TABLE IF EXISTS resumo_mensal")
+        cursor.execute('''
+            CREATE TABLE resumo_mensal (
+                mes TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                categoria_id INTEGER NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                quantidade INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (mes, tipo, categoria_id)
+            ) WITHOUT ROWID
+        ''')
+        self._criar_gatilhos_resumo(cursor)
+        self.reconstruir_resumo_mensal()
+
+    def _migracao_saldo_diario(self, cursor):
+        """Cria a tabela de saldos diários e os gatilhos que descartam saldos afetados.
+
+        saldo_diario guarda o saldo ao fim de cada dia com movimento. Os
+        gatilhos apagam os saldos a partir da data alterada, então a tabela é
+        sempre um prefixo válido; atualizar_saldo_diario a completa.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS saldo_diario (
+                dia TEXT PRIMARY KEY,
+                variacao INTEGER NOT NULL,
+                saldo INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_saldo_insert AFTER INSERT ON transacoes
+            BEGIN DELETE FROM saldo_diario WHERE dia >= NEW.data; END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_saldo_delete AFTER DELETE ON transacoes
+            BEGIN DELETE FROM saldo_diario WHERE dia >= OLD.data; END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_saldo_update
+            AFTER UPDATE OF data, valor, tipo ON transacoes
+            BEGIN DELETE FROM saldo_diario WHERE dia >= MIN(OLD.data, NEW.data); END
+        """)
+
+        self.atualizar_saldo_diario()
+
+    def _migracao_busca_textual(self, cursor):
+        """Cria o índice FTS5 sobre as descrições e os gatilhos que o mantêm sincronizado.
+
+        O índice não guarda o texto (content='transacoes') e ignora acentos.
+        Sem suporte a FTS5 no SQLite, buscar_transacoes recorre a LIKE.
+
+        O FTS5 grava seus dados pendentes a cada comando, então indexar linha
+        a linha em uma importação cria milhares de segmentos minúsculos. Por
+        isso o gatilho de inserção pode ser pausado em busca_controle, e
+        add_transacoes_bulk indexa as linhas novas com um único comando.
+        """
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE transacoes_fts USING fts5(
+                    descricao,
+                    content='transacoes',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS busca_controle (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                pausada INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO busca_controle (id, pausada) VALUES (1, 0)")
+
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_fts_insert AFTER INSERT ON transacoes
+            WHEN (SELECT pausada FROM busca_controle) = 0
+            BEGIN
+                INSERT INTO transacoes_fts (rowid, descricao) VALUES (NEW.id, NEW.descricao);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_fts_delete AFTER DELETE ON transacoes
+            BEGIN
+                INSERT INTO transacoes_fts (transacoes_fts, rowid, descricao) VALUES ('delete', OLD.id, OLD.descricao);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_fts_update AFTER UPDATE OF descricao ON transacoes
+            BEGIN
+                INSERT INTO transacoes_fts (transacoes_fts, rowid, descricao) VALUES ('delete', OLD.id, OLD.descricao);
+                INSERT INTO transacoes_fts (rowid, descricao) VALUES (NEW.id, NEW.descricao);
+            END
+        """)
+        cursor.execute("INSERT INTO transacoes_fts (transacoes_fts) VALUES ('rebuild')")
+
+    def _migracao_hash_manuais(self, cursor):
+        """Preenche o hash das transações lançadas à mão depois de _migracao_hash_transacoes"""
+        cursor.execute("SELECT id, data, descricao, valor, tipo FROM transacoes WHERE hash IS NULL ORDER BY id")
+        pendentes = cursor.fetchall()
+        hashes = self._hashes_livres(cursor, [linha[1:] for linha in pendentes])
+        cursor.executemany("UPDATE transacoes SET hash = ? WHERE id = ?",
+                           zip(hashes, (linha[0] for linha in pendentes)))
+
+    def _hashes_livres(self, cursor, linhas):
+        """Retorna o hash de cada linha (data, descricao, valor, tipo) a inserir sem deduplicação.
+
+        Toda transação tem o hash do conteúdo, seja lançada à mão ou
+        importada, então uma importação posterior trata ambas da mesma
+        forma. Linhas idênticas às já gravadas recebem a próxima ocorrência
+        livre.
+        """
+        ocorrencias = {}
+        hashes = []
+        for data, descricao, valor, tipo in linhas:
+            base = hash_transacao(data, descricao, valor, tipo)
+            ocorrencia = ocorrencias.get(base, 0)
+            while True:
+                digest = hash_transacao(data, descricao, valor, tipo, ocorrencia) if ocorrencia else base
+                cursor.execute("SELECT 1 FROM transacoes WHERE hash = ?", (digest,))
+                if cursor.fetchone() is None:
+                    break
+                ocorrencia += 1
+            ocorrencias[base] = ocorrencia + 1
+            hashes.append(digest)
+        return hashes
 
-        # Inserir categorias padrão se não existirem
-        cursor.execute("SELECT COUNT(*) FROM categorias")
-        if cursor.fetchone()[0] == 0:
-            categorias_padrao = [
-                ('Salário', 'entrada'),
-                ('Investimentos', 'entrada'),
-                ('Outros', 'entrada'),
-                ('Alimentação', 'saida'),
-                ('Moradia', 'saida'),
-                ('Transporte', 'saida'),
-                ('Saúde', 'saida'),
-                ('Educação', 'saida'),
-                ('Lazer', 'saida'),
-                ('Outros', 'saida')
-            ]
-            cursor.executemany("INSERT INTO categorias (nome, tipo) VALUES (?, ?)", categorias_padrao)
-
-        conn.commit()
-        conn.close()
+    def atualizar_saldo_diario(self):
+        """Grava os saldos diários que faltam após o último saldo válido.
+
+        Só os dias posteriores ao último registro são recalculados, com uma
+        soma acumulada (função de janela) sobre as variações diárias.
+        """
+        with self.transacao() as cursor:
+            cursor.execute("""
+                INSERT INTO saldo_diario (dia, variacao, saldo)
+                WITH ultimo AS (
+                    SELECT dia, saldo FROM saldo_diario ORDER BY dia DESC LIMIT 1
+                ),
+                variacoes AS (
+                    SELECT data AS dia, SUM(CASE WHEN tipo = 'entrada' THEN valor ELSE -valor END) AS variacao
+                    FROM transacoes
+                    WHERE data > COALESCE((SELECT dia FROM ultimo), '')
+                    GROUP BY data
+                )
+                SELECT dia, variacao,
+                       COALESCE((SELECT saldo FROM ultimo), 0) + SUM(variacao) OVER (ORDER BY dia)
+                FROM variacoes
+            """)
+            return cursor.rowcount
+
+    def reconstruir_resumo_mensal(self):
+        """Recalcula resumo_mensal a partir de todas as transações"""
+        with self.transacao() as cursor:
+            cursor.execute("DELETE FROM resumo_mensal")
+            cursor.execute("""
+                INSERT INTO resumo_mensal (mes, tipo, categoria_id, total, quantidade)
+                SELECT strftime('%Y-%m', data), tipo, COALESCE(categoria_id, 0), SUM(valor), COUNT(*)
+                FROM transacoes
+                GROUP BY 1, 2, 3
+            """)
 
     def get_categorias(self, tipo=None):
         """Retorna todas as categorias ou apenas as de um tipo específico"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if tipo:
-            cursor.execute("SELECT id, nome FROM categorias WHERE tipo = ?", (tipo,))
-        else:
-            cursor.execute("SELECT id, nome FROM categorias")
-            
-        categorias = cursor.fetchall()
-        conn.close()
-        return categorias
+        return self.categorias.listar(tipo)
 
     def add_categoria(self, nome, tipo):
         """Adiciona uma nova categoria"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO categorias (nome, tipo) VALUES (?, ?)", (nome, tipo))
-        conn.commit()
-        conn.close()
+        try:
+            with self.transacao() as cursor:
+                cursor.execute("INSERT INTO categorias (nome, tipo) VALUES (?, ?)", (nome, tipo))
+        finally:
+            self.categorias.invalidar()
+
+    def update_categoria(self, categoria_id, nome):
+        """Renomeia uma categoria"""
+        try:
+            with self.transacao() as cursor:
+                cursor.execute("UPDATE categorias SET nome = ? WHERE id = ?", (nome, categoria_id))
+        finally:
+            self.categorias.invalidar()
 
     def delete_categoria(self, categoria_id):
         """Remove uma categoria"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM categorias WHERE id = ?", (categoria_id,))
-        conn.commit()
-        conn.close()
+        try:
+            with self.transacao() as cursor:
+                cursor.execute("DELETE FROM categorias WHERE id = ?", (categoria_id,))
+        finally:
+            self.categorias.invalidar()
 
     def add_transacao(self, data, descricao, categoria_id, valor, tipo):
-        """Adiciona uma nova transação"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Adiciona uma nova transação (valor em centavos) e retorna o seu id"""
+        with self.transacao() as cursor:
+            digest, = self._hashes_livres(cursor, [(data, descricao, valor, tipo)])
+            cursor.execute("""
+                INSERT INTO transacoes (data, descricao, categoria_id, valor, tipo, hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (data, descricao, categoria_id, valor, tipo, digest))
+            self._marcar_saldo_pendente()
+            return cursor.lastrowid
+
+    def get_transacao(self, transacao_id):
+        """Retorna a transação (id, data, descricao, categoria, valor, tipo) ou None"""
+        cursor = self._cursor()
         cursor.execute("""
-            INSERT INTO transacoes (data, descricao, categoria_id, valor, tipo)
-            VALUES (?, ?, ?, ?, ?)
-        """, (data, descricao, categoria_id, valor, tipo))
-        conn.commit()
-        conn.close()
+            SELECT t.id, t.data, t.descricao, c.nome as categoria, t.valor, t.tipo
+            FROM transacoes t
+            LEFT JOIN categorias c ON t.categoria_id = c.id
+            WHERE t.id = ?
+        """, (transacao_id,))
+        return cursor.fetchone()
 
+    def add_transacoes_bulk(self, transacoes, duplicadas=None):
+        """Adiciona várias transações (data, descricao, categoria_id, valor, tipo) em uma única transação.
+
+        valor é em centavos, como em todo o Database.
+
+        Com duplicadas='ignorar' ou 'atualizar', cada tupla traz um sexto item,
+        o hash_transacao da linha: transações já existentes são ignoradas ou
+        têm a categoria atualizada. Sem duplicadas, tudo é inserido e cada
+        linha recebe a próxima ocorrência livre do seu hash. Retorna o número
+        de linhas gravadas.
+        """
+        if duplicadas is None:
+            query = """
+                INSERT INTO transacoes (data, descricao, categoria_id, valor, tipo, hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """
+        elif duplicadas == 'ignorar':
+            query = """
+                INSERT INTO transacoes (data, descricao, categoria_id, valor, tipo, hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (hash) DO NOTHING
+            """
+        elif duplicadas == 'atualizar':
+            query = """
+                INSERT INTO transacoes (data, descricao, categoria_id, valor, tipo, hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (hash) DO UPDATE SET categoria_id = excluded.categoria_id
+                WHERE categoria_id IS NOT excluded.categoria_id
+            """
+        else:
+            raise ValueError(f"Modo de duplicadas inválido: {duplicadas}")
+
+        with self.transacao() as cursor:
+            if duplicadas is None:
+                transacoes = list(transacoes)
+                hashes = self._hashes_livres(cursor, [(t[0], t[1], t[3], t[4]) for t in transacoes])
+                transacoes = [t[:5] + (digest,) for t, digest in zip(transacoes, hashes)]
+            self._marcar_saldo_pendente()
+            if not self.busca_textual:
+                cursor.executemany(query, transacoes)
+                return cursor.rowcount
+
+            # Indexar as linhas novas de uma vez, e não uma a uma pelo gatilho
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM transacoes")
+            ultimo_id = cursor.fetchone()[0]
+            cursor.execute("UPDATE busca_controle SET pausada = 1")
+            try:
+                cursor.executemany(query, transacoes)
+                gravadas = cursor.rowcount
+            finally:
+                cursor.execute("UPDATE busca_controle SET pausada = 0")
+            cursor.execute("""
+                INSERT INTO transacoes_fts (rowid, descricao)
+                SELECT id, descricao FROM transacoes WHERE id > ?
+            """, (ultimo_id,))
+            return gravadas
+
+    @_cacheado
     def get_transacoes(self, mes=None, ano=None, tipo=None):
         """Retorna as transações com filtros opcionais"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._cursor()
         
         query = """
             SELECT t.id, t.data, t.descricao, c.nome as categoria, t.valor, t.tipo
@@ -109,14 +834,9 @@ class Database:
             LEFT JOIN categorias c ON t.categoria_id = c.id
             WHERE 1=1
         """
-        params = []
+        filtro, params = _filtro_periodo('t.data', mes, ano)
+        query += filtro
         
-        if mes:
-            query += " AND strftime('%m', t.data) = ?"
-            params.append(f"{mes:02d}")
-        if ano:
-            query += " AND strftime('%Y', t.data) = ?"
-            params.append(str(ano))
         if tipo:
             query += " AND t.tipo = ?"
             params.append(tipo)
@@ -124,81 +844,311 @@ class Database:
         query += " ORDER BY t.data DESC"
         
         cursor.execute(query, params)
-        transacoes = cursor.fetchall()
-        conn.close()
-        return transacoes
+        return cursor.fetchall()
+
+    def iter_transacoes(self, mes=None, ano=None, tipo=None, tamanho_lote=10000):
+        """Percorre as transações filtradas em lotes de até tamanho_lote linhas.
+
+        Cada linha é (data, descricao, categoria, valor, tipo), em ordem
+        crescente de (data, id). O cursor é lido com fetchmany, sem montar o
+        resultado inteiro na memória, e nada passa pelo cache de consultas.
+        """
+        cursor = self._cursor()
+
+        query = """
+            SELECT t.data, t.descricao, c.nome as categoria, t.valor, t.tipo
+            FROM transacoes t
+            LEFT JOIN categorias c ON t.categoria_id = c.id
+            WHERE 1=1
+        """
+        filtro, params = _filtro_periodo('t.data', mes, ano)
+        query += filtro
+
+        if tipo:
+            query += " AND t.tipo = ?"
+            params.append(tipo)
+
+        query += " ORDER BY t.data, t.id"
+
+        cursor.execute(query, params)
+        try:
+            while True:
+                lote = cursor.fetchmany(tamanho_lote)
+                if not lote:
+                    return
+                yield lote
+        finally:
+            cursor.close()
+
+    @_cacheado
+    def get_transacoes_pagina(self, mes=None, ano=None, tipo=None, limite=200, apos=None, antes=None):
+        """Retorna uma página de transações usando paginação por chave (data, id).
+
+        apos=(data, id) busca a página seguinte a essa chave e antes=(data, id)
+        a anterior; em ambos os casos as linhas voltam em ordem decrescente.
+        """
+        return self._pagina("", [], mes, ano, tipo, limite, apos, antes)
+
+    @_cacheado
+    def buscar_transacoes(self, texto, mes=None, ano=None, tipo=None, limite=200, apos=None, antes=None):
+        """Busca transações cuja descrição contém todas as palavras do texto.
+
+        Cada palavra casa como prefixo e sem diferenciar acentos ('farm'
+        encontra 'Farmácia'). Os filtros e a paginação por (data, id) são os
+        mesmos de get_transacoes_pagina.
+        """
+        palavras = texto.split()
+        if self.busca_textual:
+            # Palavras só de pontuação não geram termos no FTS e esvaziariam o resultado
+            palavras = [p for p in palavras if any(c.isalnum() for c in p)]
+        if not palavras:
+            return self.get_transacoes_pagina(mes, ano, tipo, limite, apos, antes)
+
+        if self.busca_textual:
+            consulta = ' AND '.join('"{}"*'.format(p.replace('"', '""')) for p in palavras)
+
+            # Poucos resultados: partir do índice FTS e ordenar. Muitos: percorrer
+            # o índice de data ('+' desativa o uso de t.id) e parar no limite.
+            cursor = self._cursor()
+            cursor.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT rowid FROM transacoes_fts WHERE transacoes_fts MATCH ? LIMIT ?
+                )
+            """, (consulta, self.LIMIAR_BUSCA_AMPLA))
+            coluna = '+t.id' if cursor.fetchone()[0] >= self.LIMIAR_BUSCA_AMPLA else 't.id'
+
+            filtro = f" AND {coluna} IN (SELECT rowid FROM transacoes_fts WHERE transacoes_fts MATCH ?)"
+            return self._pagina(filtro, [consulta], mes, ano, tipo, limite, apos, antes)
+
+        # Sem FTS5: LIKE percorre a tabela e diferencia acentos
+        filtro = " AND t.descricao LIKE ? ESCAPE '\\'" * len(palavras)
+        params = [
+            '%' + p.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            for p in palavras
+        ]
+        return self._pagina(filtro, params, mes, ano, tipo, limite, apos, antes)
+
+    def _pagina(self, filtro_extra, params_extra, mes, ano, tipo, limite, apos, antes):
+        """Executa a consulta paginada por (data, id) com um filtro adicional"""
+        cursor = self._cursor()
+
+        query = """
+            SELECT t.id, t.data, t.descricao, c.nome as categoria, t.valor, t.tipo
+            FROM transacoes t
+            LEFT JOIN categorias c ON t.categoria_id = c.id
+            WHERE 1=1
+        """
+        filtro, params = _filtro_periodo('t.data', mes, ano)
+        query += filtro + filtro_extra
+        params.extend(params_extra)
+
+        if tipo:
+            query += " AND t.tipo = ?"
+            params.append(tipo)
+
+        if apos:
+            query += " AND (t.data, t.id) < (?, ?)"
+            params.extend(apos)
+        elif antes:
+            query += " AND (t.data, t.id) > (?, ?)"
+            params.extend(antes)
+
+        ordem = "ASC" if antes and not apos else "DESC"
+        query += f" ORDER BY t.data {ordem}, t.id {ordem} LIMIT ?"
+        params.append(limite)
+
+        cursor.execute(query, params)
+        pagina = cursor.fetchall()
+        if ordem == "ASC":
+            pagina.reverse()
+        return pagina
+
+    def get_transacoes_columnar(self, mes=None, ano=None, tipo=None):
+        """Retorna as transações filtradas como um TransactionFrame (colunas NumPy).
+
+        As linhas vêm em ordem crescente de (data, id). O resultado não passa
+        pelo cache de consultas.
+        """
+        from utils.transaction_frame import TransactionFrame
+
+        cursor = self._cursor()
+
+        # Datas como dias desde 1970-01-01 e tipo como código, prontos para NumPy
+        query = """
+            SELECT t.id, CAST(julianday(t.data) - 2440587.5 AS INTEGER), COALESCE(t.categoria_id, 0),
+                   t.valor, t.tipo = 'saida'
+            FROM transacoes t
+            WHERE 1=1
+        """
+        filtro, params = _filtro_periodo('t.data', mes, ano)
+        query += filtro
+
+        if tipo:
+            query += " AND t.tipo = ?"
+            params.append(tipo)
+
+        query += " ORDER BY t.data, t.id"
+
+        cursor.execute(query, params)
+        return TransactionFrame.de_linhas(cursor, self.categorias.nome)
 
     def update_transacao(self, transacao_id, data, descricao, categoria_id, valor, tipo):
-        """Atualiza uma transação existente"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE transacoes 
-            SET data = ?, descricao = ?, categoria_id = ?, valor = ?, tipo = ?
-            WHERE id = ?
-        """, (data, descricao, categoria_id, valor, tipo, transacao_id))
-        conn.commit()
-        conn.close()
+        """Atualiza uma transação existente (valor em centavos)"""
+        with self.transacao() as cursor:
+            cursor.execute("""
+                UPDATE transacoes 
+                SET data = ?, descricao = ?, categoria_id = ?, valor = ?, tipo = ?
+                WHERE id = ?
+            """, (data, descricao, categoria_id, valor, tipo, transacao_id))
+            self._marcar_saldo_pendente()
 
     def delete_transacao(self, transacao_id):
         """Remove uma transação"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM transacoes WHERE id = ?", (transacao_id,))
-        conn.commit()
-        conn.close()
+        with self.transacao() as cursor:
+            cursor.execute("DELETE FROM transacoes WHERE id = ?", (transacao_id,))
+            self._marcar_saldo_pendente()
+
+    @_cacheado
+    def get_resumo_mensal(self, mes=None, ano=None, tipo=None):
+        """Retorna os totais pré-agregados (mes, tipo, categoria_id, total, quantidade)"""
+        cursor = self._cursor()
+
+        query = """
+            SELECT r.mes, r.tipo, r.categoria_id, r.total, r.quantidade
+            FROM resumo_mensal r
+            WHERE 1=1
+        """
+        filtro, params = _filtro_resumo(mes, ano)
+        query += filtro
+
+        if tipo:
+            query += " AND r.tipo = ?"
+            params.append(tipo)
 
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    @_cacheado
+    def get_totais(self, mes=None, ano=None, tipo=None):
+        """Retorna entradas, saídas, saldo e quantidades do período em uma única consulta"""
+        cursor = self._cursor()
+
+        query = """
+            SELECT
+                COALESCE(SUM(CASE WHEN r.tipo = 'entrada' THEN r.total END), 0),
+                COALESCE(SUM(CASE WHEN r.tipo = 'saida' THEN r.total END), 0),
+                COALESCE(SUM(CASE WHEN r.tipo = 'entrada' THEN r.quantidade END), 0),
+                COALESCE(SUM(CASE WHEN r.tipo = 'saida' THEN r.quantidade END), 0)
+            FROM resumo_mensal r
+            WHERE 1=1
+        """
+        filtro, params = _filtro_resumo(mes, ano)
+        query += filtro
+
+        if tipo:
+            query += " AND r.tipo = ?"
+            params.append(tipo)
+
+        cursor.execute(query, params)
+        entradas, saidas, qtd_entradas, qtd_saidas = cursor.fetchone()
+        return {
+            'entradas': entradas,
+            'saidas': saidas,
+            'saldo': entradas - saidas,
+            'qtd_entradas': qtd_entradas,
+            'qtd_saidas': qtd_saidas,
+        }
+
+    @_cacheado
+    def get_saldo_em(self, data):
+        """Retorna o saldo acumulado (centavos) ao fim do dia informado.
+
+        Parte do último saldo diário gravado até a data e soma apenas as
+        transações posteriores a ele.
+        """
+        cursor = self._cursor()
+        cursor.execute("""
+            WITH ultimo AS (
+                SELECT dia, saldo FROM saldo_diario WHERE dia <= ? ORDER BY dia DESC LIMIT 1
+            )
+            SELECT COALESCE((SELECT saldo FROM ultimo), 0) + COALESCE((
+                SELECT SUM(CASE WHEN tipo = 'entrada' THEN valor ELSE -valor END)
+                FROM transacoes
+                WHERE data > COALESCE((SELECT dia FROM ultimo), '') AND data <= ?
+            ), 0)
+        """, (str(data), str(data)))
+        return cursor.fetchone()[0]
+
+    @_cacheado
+    def get_saldo_acumulado(self, inicio=None, fim=None):
+        """Retorna (dia, saldo) ao fim de cada dia com movimento entre inicio e fim.
+
+        Dias cobertos por saldo_diario vêm direto da tabela; os posteriores
+        ao último saldo gravado são calculados com SUM(...) OVER (ORDER BY data).
+        """
+        inicio = str(inicio) if inicio else ''
+        fim = str(fim) if fim else '9999-12-31'
+
+        cursor = self._cursor()
+        cursor.execute("""
+            WITH ultimo AS (
+                SELECT dia, saldo FROM saldo_diario ORDER BY dia DESC LIMIT 1
+            ),
+            variacoes AS (
+                SELECT data AS dia, SUM(CASE WHEN tipo = 'entrada' THEN valor ELSE -valor END) AS variacao
+                FROM transacoes
+                WHERE data > COALESCE((SELECT dia FROM ultimo), '') AND data <= ?
+                GROUP BY data
+            )
+            SELECT dia, saldo FROM saldo_diario WHERE dia >= ? AND dia <= ?
+            UNION ALL
+            SELECT dia, saldo FROM (
+                SELECT dia, COALESCE((SELECT saldo FROM ultimo), 0) + SUM(variacao) OVER (ORDER BY dia) AS saldo
+                FROM variacoes
+            )
+            WHERE dia >= ?
+            ORDER BY dia
+        """, (fim, inicio, fim, inicio))
+        return cursor.fetchall()
+
+    @_cacheado
     def get_fluxo_mensal(self, ano=None):
         """Retorna o fluxo de caixa mensal"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._cursor()
         
         query = """
             SELECT 
-                strftime('%Y-%m', data) as mes,
-                SUM(CASE WHEN tipo = 'entrada' THEN valor ELSE 0 END) as entradas,
-                SUM(CASE WHEN tipo = 'saida' THEN valor ELSE 0 END) as saidas
-            FROM transacoes
+                r.mes,
+                SUM(CASE WHEN r.tipo = 'entrada' THEN r.total ELSE 0 END) as entradas,
+                SUM(CASE WHEN r.tipo = 'saida' THEN r.total ELSE 0 END) as saidas
+            FROM resumo_mensal r
             WHERE 1=1
         """
-        params = []
-        
-        if ano:
-            query += " AND strftime('%Y', data) = ?"
-            params.append(str(ano))
+        filtro, params = _filtro_resumo(ano=ano)
+        query += filtro
             
-        query += " GROUP BY strftime('%Y-%m', data) ORDER BY mes DESC LIMIT 12"
+        query += " GROUP BY r.mes ORDER BY r.mes DESC LIMIT 12"
         
         cursor.execute(query, params)
-        fluxo = cursor.fetchall()
-        conn.close()
-        return fluxo
+        return cursor.fetchall()
 
+    @_cacheado
     def get_distribuicao_despesas(self, mes=None, ano=None):
         """Retorna a distribuição de despesas por categoria"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._cursor()
         
         query = """
             SELECT 
                 c.nome as categoria,
-                SUM(t.valor) as total
-            FROM transacoes t
-            JOIN categorias c ON t.categoria_id = c.id
-            WHERE t.tipo = 'saida'
+                SUM(r.total) as total
+            FROM resumo_mensal r
+            JOIN categorias c ON r.categoria_id = c.id
+            WHERE r.tipo = 'saida'
         """
-        params = []
-        
-        if mes:
-            query += " AND strftime('%m', t.data) = ?"
-            params.append(f"{mes:02d}")
-        if ano:
-            query += " AND strftime('%Y', t.data) = ?"
-            params.append(str(ano))
+        filtro, params = _filtro_resumo(mes, ano)
+        query += filtro
             
         query += " GROUP BY c.nome"
         
         cursor.execute(query, params)
-        distribuicao = cursor.fetchall()
-        conn.close()
-        return distribuicao 
\ No newline at end of file
+        return cursor.fetchall()
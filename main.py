@@ -5,9 +5,13 @@ def main():
     # Inicializar banco de dados
     db = Database()
     
-    # Criar e iniciar janela principal
-    app = MainWindow(db)
-    app.run()
+    try:
+        # Criar e iniciar janela principal
+        app = MainWindow(db)
+        app.run()
+    finally:
+        # Fechar conexões persistentes com o banco
+        db.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
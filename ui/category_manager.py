@@ -123,14 +123,10 @@ class CategoryManager:
         for item in self.saida_tree.get_children():
             self.saida_tree.delete(item)
         
-        # Carregar categorias de entrada
-        categorias_entrada = self.db.get_categorias('entrada')
-        for cat_id, cat_nome in categorias_entrada:
+        # Carregar categorias de entrada e de saída do índice em memória
+        for cat_id, cat_nome in self.db.categorias.listar('entrada'):
             self.entrada_tree.insert('', 'end', values=(cat_id, cat_nome))
-        
-        # Carregar categorias de saída
-        categorias_saida = self.db.get_categorias('saida')
-        for cat_id, cat_nome in categorias_saida:
+        for cat_id, cat_nome in self.db.categorias.listar('saida'):
             self.saida_tree.insert('', 'end', values=(cat_id, cat_nome))
             
     def adicionar_categoria(self, tipo):
@@ -1,17 +1,87 @@
+import base64
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from functools import lru_cache
 import ttkthemes
 
 from .transaction_form import TransactionForm
 from .category_manager import CategoryManager
-from utils.excel_importer import importar_excel, validar_arquivo_excel
-from utils.graph_utils import criar_grafico_fluxo_mensal, criar_grafico_distribuicao
+from .task_runner import TaskRunner
+from utils.moeda import formatar
+
+# matplotlib e o pipeline de importação (pandas) custam quase todo o tempo
+# de partida: são importados apenas quando os gráficos são exibidos pela
+# primeira vez (em segundo plano) e na primeira importação de arquivos.
+
+# Os mesmos valores se repetem muito entre linhas e recargas da tabela
+formatar_valor = lru_cache(maxsize=4096)(formatar)
+
+def valores_linha(t):
+    """Valores exibidos na tabela para uma transação (id, data, descrição, categoria, centavos, tipo)"""
+    return (t[1], t[2], t[3], formatar_valor(t[4]), 'Entrada' if t[5] == 'entrada' else 'Saída')
+
+# Ajustes incrementais dos dados exibidos, sem refazer as consultas. As
+# funções recebem transações no formato de Database.get_transacao e
+# sinal=1 para somá-las ou -1 para retirá-las.
+
+def no_periodo(data, mes, ano):
+    """Indica se a data 'AAAA-MM-DD' passa pelos filtros de mês e ano"""
+    return (not ano or int(data[:4]) == int(ano)) and (not mes or int(data[5:7]) == int(mes))
+
+def ajustar_totais(totais, transacao, sinal):
+    """Aplica a transação aos totais de get_totais, no próprio dicionário"""
+    chave = 'entradas' if transacao[5] == 'entrada' else 'saidas'
+    totais[chave] += sinal * transacao[4]
+    totais['qtd_' + chave] += sinal
+    totais['saldo'] = totais['entradas'] - totais['saidas']
+
+def ajustar_fluxo(fluxo, transacao, sinal, meses=12):
+    """Retorna as linhas de get_fluxo_mensal com a transação aplicada.
+    
+    Retorna None quando um mês fica vazio, pois o mês que entraria no
+    lugar dele só pode vir do banco.
+    """
+    mes = transacao[1][:7]
+    linhas = {linha[0]: [linha[1], linha[2]] for linha in fluxo}
+    if mes not in linhas:
+        # Mês anterior aos exibidos
+        if sinal < 0 or (len(linhas) >= meses and mes < min(linhas)):
+            return fluxo
+        linhas[mes] = [0, 0]
+        
+    linhas[mes][0 if transacao[5] == 'entrada' else 1] += sinal * transacao[4]
+    if linhas[mes] == [0, 0]:
+        return None
+    return [(m, e, s) for m, (e, s) in sorted(linhas.items(), reverse=True)[:meses]]
+
+def ajustar_distribuicao(distribuicao, transacao, sinal):
+    """Retorna as linhas de get_distribuicao_despesas com a transação aplicada, ou None se uma categoria esvaziar"""
+    categoria = transacao[3]
+    if transacao[5] != 'saida' or categoria is None:
+        return distribuicao
+        
+    totais = dict(distribuicao)
+    totais[categoria] = totais.get(categoria, 0) + sinal * transacao[4]
+    if totais[categoria] <= 0:
+        return None
+    return sorted(totais.items())
 
 class MainWindow:
+    # Tabela paginada: linhas por consulta e páginas mantidas no Treeview
+    TAMANHO_PAGINA = 200
+    MAX_PAGINAS = 3
+    
+    # Duração máxima de cada lote de inserções na tabela antes de devolver o controle ao Tk
+    LOTE_TABELA_MS = 15
+    
+    # Espera após a última tecla antes de buscar
+    ATRASO_BUSCA_MS = 300
+    
+    # Espera após o último redimensionamento antes de redesenhar os gráficos
+    ATRASO_REDIMENSIONAMENTO_MS = 200
+
     def __init__(self, db):
         self.window = tk.Tk()
         self.window.title("Fluxo de Caixa")
@@ -19,6 +89,21 @@ class MainWindow:
         self.window.configure(bg='#f0f0f0')
         
         self.db = db
+        self._chaves = {}
+        self._valores = {}
+        self._preenchimento = None
+        self._ha_mais_acima = False
+        self._ha_mais_abaixo = False
+        self._carregando_pagina = False
+        self._filtros_tabela = (None, None, None)
+        self._busca = ''
+        self._busca_agendada = None
+        self._totais = None
+        self._periodo_resumo = (None, None)
+        self._dados_graficos = None
+        self._periodo_graficos = (None, None)
+        self.tarefas = TaskRunner(self.window, ao_mudar_pendentes=self.atualizar_progresso)
+        self.window.protocol("WM_DELETE_WINDOW", self.fechar)
         self.setup_styles()
         self.criar_interface()
         
@@ -91,6 +176,12 @@ class MainWindow:
             style='Accent.TButton'
         ).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(
+            botoes_frame,
+            text="Excluir",
+            command=self.excluir_transacao
+        ).pack(side=tk.LEFT, padx=5)
+        
         ttk.Button(
             botoes_frame,
             text="Gerenciar Categorias",
@@ -99,10 +190,22 @@ class MainWindow:
         
         ttk.Button(
             botoes_frame,
-            text="Importar Excel",
+            text="Importar Arquivo",
             command=self.importar_excel
         ).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(
+            botoes_frame,
+            text="Importar Pasta",
+            command=self.importar_pasta
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            botoes_frame,
+            text="Exportar",
+            command=self.exportar
+        ).pack(side=tk.LEFT, padx=5)
+        
         # Frame para filtros e tabela
         content_frame = ttk.Frame(main_frame)
         content_frame.pack(fill=tk.BOTH, expand=True)
@@ -144,6 +247,12 @@ class MainWindow:
         self.tipo_combo.pack(side=tk.LEFT, padx=5)
         self.tipo_combo.set("Todos")
         
+        # Busca na descrição, executada enquanto se digita
+        ttk.Label(filtros_frame, text="Buscar:").pack(side=tk.LEFT, padx=5)
+        self.busca_var = tk.StringVar()
+        self.busca_var.trace_add('write', self.agendar_busca)
+        ttk.Entry(filtros_frame, textvariable=self.busca_var, width=25).pack(side=tk.LEFT, padx=5)
+        
         # Botão aplicar filtros
         ttk.Button(
             filtros_frame,
@@ -151,6 +260,13 @@ class MainWindow:
             command=self.aplicar_filtros
         ).pack(side=tk.LEFT, padx=20)
         
+        # Indicador de tarefas em segundo plano
+        self.progresso = ttk.Progressbar(filtros_frame, mode='indeterminate', length=120)
+        self.progresso.pack(side=tk.RIGHT, padx=5)
+        
+        self.status_label = ttk.Label(filtros_frame, text="")
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+        
         # Tabela de transações
         tabela_frame = ttk.LabelFrame(content_frame, text="Transações", padding="10")
         tabela_frame.pack(fill=tk.BOTH, expand=True)
@@ -176,40 +292,70 @@ class MainWindow:
         self.tabela.column('valor', width=100)
         self.tabela.column('tipo', width=100)
         
-        # Adicionar scrollbar
-        scrollbar = ttk.Scrollbar(tabela_frame, orient=tk.VERTICAL, command=self.tabela.yview)
-        self.tabela.configure(yscrollcommand=scrollbar.set)
+        # Adicionar scrollbar (a rolagem também dispara a carga de novas páginas)
+        self.scrollbar = ttk.Scrollbar(tabela_frame, orient=tk.VERTICAL, command=self.tabela.yview)
+        self.tabela.configure(yscrollcommand=self.ao_rolar_tabela)
         
         # Posicionar elementos
         self.tabela.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Frame para gráficos
         graficos_frame = ttk.Frame(main_frame)
         graficos_frame.pack(fill=tk.BOTH, expand=True, pady=(20, 0))
         
         # Gráfico de fluxo mensal
-        fluxo_frame = ttk.LabelFrame(graficos_frame, text="Fluxo de Caixa Mensal", padding="10")
-        fluxo_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
-        
-        self.fig_fluxo = Figure(figsize=(6, 4), facecolor='#f0f0f0')
-        self.canvas_fluxo = FigureCanvasTkAgg(self.fig_fluxo, master=fluxo_frame)
-        self.canvas_fluxo.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.fluxo_frame = ttk.LabelFrame(graficos_frame, text="Fluxo de Caixa Mensal", padding="10")
+        self.fluxo_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
         
         # Gráfico de distribuição
-        dist_frame = ttk.LabelFrame(graficos_frame, text="Distribuição de Despesas", padding="10")
-        dist_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        self.fig_dist = Figure(figsize=(6, 4), facecolor='#f0f0f0')
-        self.canvas_dist = FigureCanvasTkAgg(self.fig_dist, master=dist_frame)
-        self.canvas_dist.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.dist_frame = ttk.LabelFrame(graficos_frame, text="Distribuição de Despesas", padding="10")
+        self.dist_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        # Os gráficos são rasterizados fora da tela (utils.chart_render) e
+        # exibidos como imagens; o renderizador é criado quando os painéis
+        # aparecem na tela
+        self.canvas_fluxo = tk.Canvas(self.fluxo_frame, width=600, height=400, bg='#f0f0f0', highlightthickness=0)
+        self.canvas_fluxo.pack(fill=tk.BOTH, expand=True)
+        self.canvas_dist = tk.Canvas(self.dist_frame, width=600, height=400, bg='#f0f0f0', highlightthickness=0)
+        self.canvas_dist.pack(fill=tk.BOTH, expand=True)
+        
+        self.renderizador = None
+        self._imagens = {}
+        self._tamanhos_graficos = None
+        self._redimensionamento = None
+        self.canvas_fluxo.bind('<Configure>', self.agendar_redimensionamento)
+        self.canvas_dist.bind('<Configure>', self.agendar_redimensionamento)
         
         # Configurar eventos
         self.tabela.bind('<Double-1>', self.editar_transacao)
+        self.tabela.bind('<Delete>', self.excluir_transacao)
         
-        # Carregar dados iniciais
+        # Carregar dados iniciais (os gráficos carregam ao aparecer na tela)
         self.carregar_transacoes()
-        self.atualizar_graficos()
+        
+    def agendar_redimensionamento(self, event=None):
+        """Redesenha os gráficos quando os painéis pararem de mudar de tamanho"""
+        if self._redimensionamento is not None:
+            self.window.after_cancel(self._redimensionamento)
+        self._redimensionamento = self.window.after(self.ATRASO_REDIMENSIONAMENTO_MS, self.redimensionar_graficos)
+        
+    def redimensionar_graficos(self):
+        """Cria o renderizador na primeira exibição e redesenha os gráficos no novo tamanho"""
+        self._redimensionamento = None
+        if self.renderizador is None:
+            from utils.chart_render import ChartRenderer
+            self.renderizador = ChartRenderer(self.db)
+            self.atualizar_graficos()
+        elif self.tamanhos_graficos() != self._tamanhos_graficos:
+            self.atualizar_graficos(self._periodo_graficos)
+            
+    def tamanhos_graficos(self):
+        """Tamanho atual, em pixels, de cada painel de gráfico"""
+        return tuple(
+            (max(canvas.winfo_width(), 100), max(canvas.winfo_height(), 100))
+            for canvas in (self.canvas_fluxo, self.canvas_dist)
+        )
         
     def nova_transacao(self, tipo):
         """Abre o formulário para nova transação"""
@@ -217,24 +363,182 @@ class MainWindow:
         self.window.wait_window(form.window)
         
         if form.resultado:
-            self.carregar_transacoes()
-            self.atualizar_graficos()
+            self.gravar(self.gravar_transacao, None, form.resultado)
             
-    def editar_transacao(self, event):
+    def editar_transacao(self, event=None):
         """Edita a transação selecionada"""
         item = self.tabela.selection()
         if not item:
             return
             
-        transacao = self.tabela.item(item[0])['values']
-        tipo = 'entrada' if transacao[4] == 'Entrada' else 'saida'
+        # As linhas da tabela são identificadas pelo id da transação
+        self.tarefas.executar(
+            self.db.get_transacao,
+            int(item[0]),
+            chave='edicao',
+            # Abrir o formulário fora do despacho das tarefas, que a espera modal bloquearia
+            ao_concluir=lambda antiga: self.window.after_idle(self.abrir_edicao, antiga),
+            ao_falhar=self.mostrar_erro
+        )
         
-        form = TransactionForm(self.window, self.db, tipo, transacao)
+    def abrir_edicao(self, antiga):
+        """Abre o formulário de edição de uma transação lida do banco"""
+        if antiga is None:
+            self.carregar_transacoes()
+            return
+            
+        form = TransactionForm(self.window, self.db, antiga[5], antiga)
         self.window.wait_window(form.window)
         
         if form.resultado:
+            self.gravar(self.gravar_transacao, antiga, form.resultado)
+            
+    def excluir_transacao(self, event=None):
+        """Exclui a transação selecionada"""
+        item = self.tabela.selection()
+        if not item:
+            return
+            
+        if not messagebox.askyesno("Confirmar", "Tem certeza que deseja excluir esta transação?"):
+            return
+            
+        self.gravar(self.remover_transacao, int(item[0]))
+        
+    def gravar(self, funcao, *args):
+        """Executa uma escrita no banco em segundo plano e reflete a alteração ao concluir.
+        
+        Uma importação pode manter o banco bloqueado por vários segundos;
+        fora da thread do Tk, a espera não congela a janela. funcao retorna
+        o par (antiga, nova) de aplicar_alteracao.
+        """
+        geracoes = {chave: self.tarefas.geracao(chave) for chave in ('resumo', 'graficos')}
+        self.tarefas.executar(
+            funcao,
+            *args,
+            ao_concluir=lambda alteracao: self.concluir_gravacao(alteracao, geracoes),
+            ao_falhar=self.falha_gravacao
+        )
+        
+    def gravar_transacao(self, antiga, dados):
+        """Adiciona (antiga None) ou atualiza uma transação (executado fora da thread do Tk)"""
+        if antiga is None:
+            transacao_id = self.db.add_transacao(*dados)
+        else:
+            transacao_id = antiga[0]
+            self.db.update_transacao(transacao_id, *dados)
+        return antiga, self.db.get_transacao(transacao_id)
+        
+    def remover_transacao(self, transacao_id):
+        """Exclui uma transação, se ainda existir (executado fora da thread do Tk)"""
+        antiga = self.db.get_transacao(transacao_id)
+        if antiga is not None:
+            self.db.delete_transacao(transacao_id)
+        return antiga, None
+        
+    def concluir_gravacao(self, alteracao, geracoes):
+        """Reflete na tela a transação gravada"""
+        antiga, nova = alteracao
+        # A transação já não existia: recarregar
+        if antiga is None and nova is None:
             self.carregar_transacoes()
+            return
+        self.aplicar_alteracao(antiga, nova, geracoes)
+        
+    def falha_gravacao(self, erro):
+        """Exibe o erro de uma gravação em segundo plano"""
+        messagebox.showerror("Erro", f"Erro ao salvar transação: {str(erro)}")
+        
+    def aplicar_alteracao(self, antiga, nova, geracoes):
+        """Reflete uma transação adicionada, editada ou excluída sem refazer as consultas.
+        
+        antiga e nova vêm de Database.get_transacao (None ao adicionar ou
+        excluir). A tabela muda só na linha da transação; totais e gráficos
+        são ajustados a partir dos dados já exibidos. geracoes guarda as
+        gerações das tarefas de resumo e gráficos ao iniciar a gravação:
+        uma recarga feita depois pode já incluir a alteração e não é ajustada.
+        """
+        self.atualizar_linha(antiga, nova)
+        self.ajustar_resumo(antiga, nova, geracoes['resumo'])
+        self.ajustar_graficos(antiga, nova, geracoes['graficos'])
+        
+    def atualizar_linha(self, antiga, nova):
+        """Insere, atualiza ou remove a linha de uma transação na tabela"""
+        # A busca textual só é avaliada pelo banco; com um preenchimento em
+        # andamento as posições ainda mudam. Em ambos os casos a recarga por
+        # diferença também toca apenas essa linha.
+        if self._busca or self._preenchimento is not None:
+            self.carregar_tabela()
+            return
+            
+        iid = str((antiga or nova)[0])
+        mes, ano, tipo = self._filtros_tabela
+        visivel = nova is not None and no_periodo(nova[1], mes, ano) and (not tipo or nova[5] == tipo)
+        chave = (nova[1], nova[0]) if nova is not None else None
+        
+        if iid in self._chaves:
+            if visivel and self._chaves[iid] == chave:
+                valores = valores_linha(nova)
+                if valores != self._valores[iid]:
+                    self.tabela.item(iid, values=valores)
+                    self._valores[iid] = valores
+                return
+            self.remover_linhas([iid])
+            
+        if not visivel:
+            return
+            
+        # A tabela está em ordem decrescente de (data, id)
+        itens = self.tabela.get_children()
+        posicao = sum(1 for item in itens if self._chaves[item] > chave)
+        
+        # Fora das páginas carregadas: aparece quando a página dela for buscada
+        if (posicao == 0 and self._ha_mais_acima) or (posicao == len(itens) and self._ha_mais_abaixo):
+            return
+            
+        valores = valores_linha(nova)
+        self._chaves[iid] = chave
+        self._valores[iid] = valores
+        self.tabela.insert('', posicao, iid=iid, values=valores)
+        self.tabela.selection_set(iid)
+        self.tabela.see(iid)
+        
+    def ajustar_resumo(self, antiga, nova, geracao):
+        """Ajusta os totais exibidos com a transação alterada"""
+        if (self._totais is None or self.tarefas.pendente('resumo')
+                or geracao != self.tarefas.geracao('resumo')):
+            self.atualizar_resumo()
+            return
+            
+        mes, ano = self._periodo_resumo
+        for transacao, sinal in ((antiga, -1), (nova, 1)):
+            if transacao is not None and no_periodo(transacao[1], mes, ano):
+                ajustar_totais(self._totais, transacao, sinal)
+        self.exibir_resumo(self._totais)
+        
+    def ajustar_graficos(self, antiga, nova, geracao):
+        """Ajusta os dados dos gráficos com a transação alterada e redesenha o que mudou"""
+        if self.renderizador is None:
+            return
+        if (self._dados_graficos is None or self.tarefas.pendente('graficos')
+                or geracao != self.tarefas.geracao('graficos')):
             self.atualizar_graficos()
+            return
+            
+        mes, ano = self._periodo_graficos
+        fluxo, distribuicao = self._dados_graficos
+        for transacao, sinal in ((antiga, -1), (nova, 1)):
+            if transacao is None:
+                continue
+            if fluxo is not None and no_periodo(transacao[1], None, ano):
+                fluxo = ajustar_fluxo(fluxo, transacao, sinal)
+            if distribuicao is not None and no_periodo(transacao[1], mes, ano):
+                distribuicao = ajustar_distribuicao(distribuicao, transacao, sinal)
+                
+        # Um mês ou categoria esvaziou: consultar o banco
+        if fluxo is None or distribuicao is None:
+            self.atualizar_graficos()
+            return
+        self.desenhar_graficos(mes, ano, (fluxo, distribuicao))
             
     def abrir_gerenciador_categorias(self):
         """Abre o gerenciador de categorias"""
@@ -242,20 +546,63 @@ class MainWindow:
         self.window.wait_window(manager.window)
         
     def importar_excel(self):
-        """Importa dados de um arquivo Excel"""
-        arquivo = filedialog.askopenfilename(
-            title="Selecionar arquivo Excel",
-            filetypes=[("Arquivos Excel", "*.xlsx *.xls")]
+        """Importa dados de um ou mais arquivos Excel, CSV, OFX ou QIF"""
+        from utils.import_pipeline import tipos_de_arquivo
+        
+        arquivos = filedialog.askopenfilenames(
+            title="Selecionar arquivos para importar",
+            filetypes=tipos_de_arquivo()
         )
         
-        if not arquivo:
+        if not arquivos:
             return
-            
-        if not validar_arquivo_excel(arquivo):
-            messagebox.showerror("Erro", "Arquivo Excel inválido")
+        if len(arquivos) > 1:
+            self.importar_varios(list(arquivos))
             return
+        arquivo = arquivos[0]
+            
+        # Validar e importar em segundo plano
+        self.status_label.config(text="Importando...")
+        self.tarefas.executar(
+            self.executar_importacao,
+            arquivo,
+            ao_concluir=self.concluir_importacao,
+            ao_falhar=self.mostrar_erro,
+            ao_progresso=lambda linhas: self.status_label.config(text=f"{linhas} linhas importadas...")
+        )
+        
+    def importar_pasta(self):
+        """Importa todos os arquivos suportados de um diretório"""
+        diretorio = filedialog.askdirectory(title="Selecionar pasta para importar")
+        if diretorio:
+            self.importar_varios([diretorio])
             
-        sucesso, mensagem = importar_excel(arquivo, self.db)
+    def importar_varios(self, caminhos):
+        """Importa vários arquivos com leitura em paralelo, em segundo plano"""
+        from utils.import_pipeline import importar_arquivos
+        
+        self.status_label.config(text="Importando...")
+        self.tarefas.executar(
+            importar_arquivos,
+            caminhos,
+            self.db,
+            ao_concluir=self.concluir_importacao,
+            ao_falhar=self.mostrar_erro,
+            ao_progresso=lambda p: self.status_label.config(text=f"{p[0]} de {p[1]} arquivos importados...")
+        )
+        
+    def executar_importacao(self, arquivo, progresso=None):
+        """Valida e importa o arquivo (executado fora da thread do Tk)"""
+        from utils.import_pipeline import importar_arquivo, validar_arquivo
+        
+        if not validar_arquivo(arquivo):
+            return False, "Arquivo inválido ou em formato não suportado"
+        return importar_arquivo(arquivo, self.db, progresso=progresso)
+        
+    def concluir_importacao(self, resultado):
+        """Exibe o resultado da importação e atualiza os dados"""
+        self.status_label.config(text="")
+        sucesso, mensagem = resultado
         if sucesso:
             messagebox.showinfo("Sucesso", mensagem)
             self.carregar_transacoes()
@@ -263,78 +610,332 @@ class MainWindow:
         else:
             messagebox.showerror("Erro", mensagem)
             
+    def exportar(self):
+        """Exporta as transações dos filtros atuais para CSV, XLSX ou Parquet"""
+        from utils.exporter import exportar_transacoes, tipos_de_arquivo
+        
+        arquivo = filedialog.asksaveasfilename(
+            title="Exportar transações",
+            defaultextension=".csv",
+            filetypes=tipos_de_arquivo()
+        )
+        if not arquivo:
+            return
+            
+        # Gravar em segundo plano, lendo o banco em lotes
+        self.status_label.config(text="Exportando...")
+        self.tarefas.executar(
+            exportar_transacoes,
+            self.db,
+            arquivo,
+            *self.obter_filtros(),
+            ao_concluir=self.concluir_exportacao,
+            ao_falhar=self.mostrar_erro,
+            ao_progresso=lambda linhas: self.status_label.config(text=f"{linhas} linhas exportadas...")
+        )
+        
+    def concluir_exportacao(self, resultado):
+        """Exibe o resultado da exportação"""
+        self.status_label.config(text="")
+        sucesso, mensagem = resultado
+        if sucesso:
+            messagebox.showinfo("Sucesso", mensagem)
+        else:
+            messagebox.showerror("Erro", mensagem)
+            
+    def mostrar_erro(self, erro):
+        """Exibe o erro de uma tarefa em segundo plano"""
+        self.status_label.config(text="")
+        messagebox.showerror("Erro", f"Erro ao carregar dados: {str(erro)}")
+        
+    def atualizar_progresso(self, pendentes):
+        """Liga o indicador de progresso enquanto houver tarefas pendentes"""
+        if pendentes:
+            self.progresso.start(10)
+        else:
+            self.progresso.stop()
+            
     def aplicar_filtros(self):
         """Aplica os filtros selecionados"""
         self.carregar_transacoes()
         self.atualizar_graficos()
         
-    def carregar_transacoes(self):
-        """Carrega as transações na tabela"""
-        # Limpar tabela
-        for item in self.tabela.get_children():
-            self.tabela.delete(item)
-            
-        # Obter filtros
+    def obter_filtros(self):
+        """Retorna os filtros (mes, ano, tipo) selecionados"""
         mes = int(self.mes_combo.get()) if self.mes_combo.get() else None
         ano = int(self.ano_combo.get()) if self.ano_combo.get() else None
         tipo = self.tipo_combo.get().lower() if self.tipo_combo.get() != "Todos" else None
-        
-        # Carregar transações
-        transacoes = self.db.get_transacoes(mes, ano, tipo)
-        
-        # Inserir na tabela
-        for t in transacoes:
-            self.tabela.insert('', 'end', values=(
-                t[1],  # data
-                t[2],  # descrição
-                t[3],  # categoria
-                f"R$ {t[4]:,.2f}",  # valor
-                'Entrada' if t[5] == 'entrada' else 'Saída'  # tipo
-            ))
+        return mes, ano, tipo
+        
+    def agendar_busca(self, *args):
+        """Recarrega a tabela quando a digitação na busca pausar"""
+        if self._busca_agendada is not None:
+            self.window.after_cancel(self._busca_agendada)
+        self._busca_agendada = self.window.after(self.ATRASO_BUSCA_MS, self.executar_busca)
+        
+    def executar_busca(self):
+        """Recarrega a tabela se o texto da busca mudou"""
+        self._busca_agendada = None
+        if self.busca_var.get().strip() != self._busca:
+            self.carregar_transacoes()
             
-        # Atualizar resumo
+    def consultar_pagina(self, busca, filtros, **cursor):
+        """Consulta uma página da tabela, aplicando a busca textual se houver"""
+        if busca:
+            return self.db.buscar_transacoes(busca, *filtros, limite=self.TAMANHO_PAGINA, **cursor)
+        return self.db.get_transacoes_pagina(*filtros, limite=self.TAMANHO_PAGINA, **cursor)
+        
+    def carregar_transacoes(self):
+        """Carrega a primeira página de transações na tabela e o resumo"""
+        self.carregar_tabela()
         self.atualizar_resumo()
         
+    def carregar_tabela(self):
+        """Carrega a primeira página de transações na tabela"""
+        # Bloquear a carga de páginas até a nova consulta terminar
+        self._carregando_pagina = True
+        self._filtros_tabela = self.obter_filtros()
+        self._busca = self.busca_var.get().strip()
+        
+        self.tarefas.executar(
+            self.consultar_pagina,
+            self._busca,
+            self._filtros_tabela,
+            chave='transacoes',
+            ao_concluir=self.exibir_primeira_pagina,
+            ao_falhar=self.falha_pagina
+        )
+        
+    def exibir_primeira_pagina(self, pagina):
+        """Substitui o conteúdo da tabela pela primeira página, alterando só as linhas que mudaram.
+        
+        As linhas são identificadas pelo id da transação. As que saíram do
+        resultado (ou mudaram de posição) são removidas em uma única chamada;
+        as demais são inseridas ou atualizadas em lotes por preencher_tabela.
+        """
+        if self._preenchimento is not None:
+            self.window.after_cancel(self._preenchimento)
+            
+        chaves = {str(t[0]): (t[1], t[0]) for t in pagina}
+        self.remover_linhas([
+            item for item in self.tabela.get_children() if chaves.get(item) != self._chaves[item]
+        ])
+        
+        self._ha_mais_acima = False
+        self._ha_mais_abaixo = len(pagina) == self.TAMANHO_PAGINA
+        self.preencher_tabela(pagina, 0)
+        
+    def preencher_tabela(self, pagina, indice):
+        """Insere ou atualiza as linhas a partir de indice, reagendando-se a cada LOTE_TABELA_MS.
+        
+        A tabela e a página têm a mesma ordenação, então as linhas mantidas
+        já estão na posição certa e as novas entram na posição indice.
+        """
+        limite = time.perf_counter() + self.LOTE_TABELA_MS / 1000
+        while indice < len(pagina) and time.perf_counter() < limite:
+            t = pagina[indice]
+            iid = str(t[0])
+            valores = valores_linha(t)
+            if iid not in self._chaves:
+                self._chaves[iid] = (t[1], t[0])
+                self.tabela.insert('', indice, iid=iid, values=valores)
+            elif self._valores[iid] != valores:
+                self.tabela.item(iid, values=valores)
+            self._valores[iid] = valores
+            indice += 1
+            
+        if indice < len(pagina):
+            self._preenchimento = self.window.after(1, self.preencher_tabela, pagina, indice)
+            return
+            
+        # Só agora a rolagem pode buscar novas páginas
+        self._preenchimento = None
+        self._carregando_pagina = False
+        self.tabela.yview_moveto(0)
+        
+    def falha_pagina(self, erro):
+        """Libera a tabela para novas cargas e exibe o erro"""
+        self._carregando_pagina = False
+        self.mostrar_erro(erro)
+        
+    def inserir_pagina(self, pagina, posicao):
+        """Insere uma página de transações no início ('inicio') ou no fim ('end') da tabela"""
+        for indice, t in enumerate(pagina):
+            iid = str(t[0])
+            valores = valores_linha(t)
+            self._chaves[iid] = (t[1], t[0])
+            self._valores[iid] = valores
+            self.tabela.insert('', indice if posicao == 'inicio' else 'end', iid=iid, values=valores)
+            
+    def remover_linhas(self, itens):
+        """Remove linhas da tabela com uma única chamada ao Tk"""
+        if itens:
+            self.tabela.delete(*itens)
+        for item in itens:
+            del self._chaves[item]
+            del self._valores[item]
+            
+    def ao_rolar_tabela(self, primeiro, ultimo):
+        """Atualiza a scrollbar e busca novas páginas perto das bordas"""
+        self.scrollbar.set(primeiro, ultimo)
+        
+        if self._carregando_pagina:
+            return
+        if float(ultimo) > 0.9 and self._ha_mais_abaixo:
+            self.carregar_pagina(apos=True)
+        elif float(primeiro) < 0.1 and self._ha_mais_acima:
+            self.carregar_pagina(apos=False)
+            
+    def carregar_pagina(self, apos):
+        """Busca em segundo plano a página seguinte (apos=True) ou a anterior"""
+        itens = self.tabela.get_children()
+        if not itens:
+            return
+        
+        self._carregando_pagina = True
+        if apos:
+            cursor = {'apos': self._chaves[itens[-1]]}
+            ao_concluir = self.anexar_pagina_abaixo
+        else:
+            cursor = {'antes': self._chaves[itens[0]]}
+            ao_concluir = self.anexar_pagina_acima
+        
+        self.tarefas.executar(
+            lambda: self.consultar_pagina(self._busca, self._filtros_tabela, **cursor),
+            chave='transacoes',
+            ao_concluir=ao_concluir,
+            ao_falhar=self.falha_pagina
+        )
+            
+    def anexar_pagina_abaixo(self, pagina):
+        """Acrescenta a página seguinte e descarta as do topo além do limite"""
+        self._carregando_pagina = False
+        self._ha_mais_abaixo = len(pagina) == self.TAMANHO_PAGINA
+        if not pagina:
+            return
+        
+        itens = self.tabela.get_children()
+        topo = self.tabela.yview()[0] * len(itens)
+        self.inserir_pagina(pagina, 'end')
+        
+        excedente = len(itens) + len(pagina) - self.TAMANHO_PAGINA * self.MAX_PAGINAS
+        if excedente > 0:
+            self.remover_linhas(itens[:excedente])
+            self._ha_mais_acima = True
+            # Manter a mesma linha no topo da área visível
+            self.tabela.yview_moveto((topo - excedente) / len(self.tabela.get_children()))
+            
+    def anexar_pagina_acima(self, pagina):
+        """Acrescenta a página anterior e descarta as do fim além do limite"""
+        self._carregando_pagina = False
+        self._ha_mais_acima = len(pagina) == self.TAMANHO_PAGINA
+        if not pagina:
+            return
+        
+        itens = self.tabela.get_children()
+        topo = self.tabela.yview()[0] * len(itens)
+        self.inserir_pagina(pagina, 'inicio')
+        
+        excedente = len(itens) + len(pagina) - self.TAMANHO_PAGINA * self.MAX_PAGINAS
+        if excedente > 0:
+            self.remover_linhas(itens[-excedente:])
+            self._ha_mais_abaixo = True
+        
+        # Manter a mesma linha no topo da área visível
+        self.tabela.yview_moveto((topo + len(pagina)) / len(self.tabela.get_children()))
+        
     def atualizar_resumo(self):
         """Atualiza o resumo financeiro"""
-        # Obter filtros
-        mes = int(self.mes_combo.get()) if self.mes_combo.get() else None
-        ano = int(self.ano_combo.get()) if self.ano_combo.get() else None
+        mes, ano, _ = self.obter_filtros()
+        self._periodo_resumo = (mes, ano)
+        
+        # Totais do período calculados no banco, em segundo plano
+        self.tarefas.executar(
+            self.db.get_totais,
+            mes,
+            ano,
+            chave='resumo',
+            ao_concluir=self.exibir_resumo,
+            ao_falhar=self.mostrar_erro
+        )
         
-        # Carregar transações do mês
-        transacoes = self.db.get_transacoes(mes, ano)
+    def exibir_resumo(self, totais):
+        """Exibe os totais no resumo financeiro"""
+        # Cópia própria: os ajustes incrementais alteram este dicionário
+        self._totais = dict(totais)
         
-        # Calcular totais
-        total_entradas = sum(t[4] for t in transacoes if t[5] == 'entrada')
-        total_saidas = sum(t[4] for t in transacoes if t[5] == 'saida')
-        saldo = total_entradas - total_saidas
+        total_entradas = totais['entradas']
+        total_saidas = totais['saidas']
+        saldo = totais['saldo']
         
         # Atualizar labels
         self.saldo_label.config(
-            text=f"Saldo Atual: R$ {saldo:,.2f}",
+            text=f"Saldo Atual: {formatar(saldo)}",
             foreground='#2ecc71' if saldo >= 0 else '#e74c3c'
         )
-        self.entradas_label.config(text=f"Total Entradas: R$ {total_entradas:,.2f}")
-        self.saidas_label.config(text=f"Total Saídas: R$ {total_saidas:,.2f}")
-        
-    def atualizar_graficos(self):
-        """Atualiza os gráficos"""
-        # Obter filtros
-        ano = int(self.ano_combo.get()) if self.ano_combo.get() else None
+        self.entradas_label.config(text=f"Total Entradas: {formatar(total_entradas)}")
+        self.saidas_label.config(text=f"Total Saídas: {formatar(total_saidas)}")
         
-        # Atualizar gráfico de fluxo mensal
-        dados_fluxo = self.db.get_fluxo_mensal(ano)
-        criar_grafico_fluxo_mensal(self.fig_fluxo, dados_fluxo, ano)
-        self.canvas_fluxo.draw()
+    def atualizar_graficos(self, periodo=None):
+        """Atualiza os gráficos do período (mes, ano), por padrão o dos filtros"""
+        # Ainda não exibidos: redimensionar_graficos desenha quando aparecerem
+        if self.renderizador is None:
+            return
+            
+        mes, ano = periodo or self.obter_filtros()[:2]
+        self._periodo_graficos = (mes, ano)
+        self.desenhar_graficos(mes, ano)
+        
+    def desenhar_graficos(self, mes, ano, dados=None):
+        """Obtém em segundo plano as imagens dos gráficos e as exibe.
+        
+        dados, se informado, é o par (fluxo, distribuição) já calculado;
+        senão os dados são consultados no banco.
+        """
+        self._tamanhos_graficos = self.tamanhos_graficos()
+        self.tarefas.executar(
+            self.renderizar_graficos,
+            mes,
+            ano,
+            self._tamanhos_graficos,
+            dados,
+            chave='graficos',
+            ao_concluir=self.exibir_graficos,
+            ao_falhar=self.mostrar_erro
+        )
         
-        # Atualizar gráfico de distribuição
-        dados_dist = self.db.get_distribuicao_despesas(
-            int(self.mes_combo.get()) if self.mes_combo.get() else None,
-            ano
+    def renderizar_graficos(self, mes, ano, tamanhos, dados=None):
+        """Consulta os dados e rasteriza os gráficos (executado fora da thread do Tk).
+        
+        Visões já desenhadas com a mesma versão dos dados vêm do cache de
+        imagens do renderizador, sem passar pelo matplotlib.
+        """
+        if dados is None:
+            dados = (self.db.get_fluxo_mensal(ano), self.db.get_distribuicao_despesas(mes, ano))
+        imagens = (
+            self.renderizador.png('fluxo', (ano,), tamanhos[0], dados[0]),
+            self.renderizador.png('distribuicao', (mes, ano), tamanhos[1], dados[1]),
         )
-        criar_grafico_distribuicao(self.fig_dist, dados_dist)
-        self.canvas_dist.draw()
+        return dados, imagens
+        
+    def exibir_graficos(self, resultado):
+        """Exibe as imagens dos gráficos, decodificando só as que mudaram"""
+        self._dados_graficos, imagens = resultado
+        for canvas, imagem in zip((self.canvas_fluxo, self.canvas_dist), imagens):
+            anterior = self._imagens.get(canvas)
+            if anterior is not None and anterior[0] == imagem:
+                continue
+            foto = tk.PhotoImage(data=base64.b64encode(imagem))
+            # Manter a referência: o Tk descarta imagens sem referência no Python
+            self._imagens[canvas] = (imagem, foto)
+            canvas.delete('all')
+            canvas.create_image(0, 0, image=foto, anchor=tk.NW)
+        
+    def fechar(self):
+        """Encerra as tarefas em segundo plano e fecha a janela"""
+        self.tarefas.encerrar()
+        self.window.destroy()
         
     def run(self):
         """Inicia a aplicação"""
-        self.window.mainloop() 
\ No newline at end of file
+        self.window.mainloop()
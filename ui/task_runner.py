@@ -0,0 +1,130 @@
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+class TaskRunner:
+    """Executa tarefas em threads de fundo e entrega os resultados no loop do Tk"""
+
+    INTERVALO_MS = 30
+
+    def __init__(self, window, max_workers=2, ao_mudar_pendentes=None):
+        self.window = window
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fluxo-tarefa')
+        self.ao_mudar_pendentes = ao_mudar_pendentes
+
+        self._resultados = queue.Queue()
+        self._geracoes = {}
+        self._futuros = {}
+        self._em_execucao = set()
+        self._pendentes = 0
+        self._agendamento = None
+        self._encerrado = False
+
+    def executar(self, funcao, *args, chave=None, ao_concluir=None, ao_falhar=None, ao_progresso=None):
+        """Agenda funcao(*args) em segundo plano.
+
+        Tarefas com a mesma chave se substituem: a anterior é cancelada se
+        ainda não começou e, caso já esteja rodando, seu resultado é
+        descartado. Com ao_progresso, a função recebe o argumento nomeado
+        progresso, que pode ser chamado da thread de fundo.
+        """
+        if self._encerrado:
+            return None
+
+        geracao = None
+        if chave is not None:
+            geracao = self._geracoes.get(chave, 0) + 1
+            self._geracoes[chave] = geracao
+            anterior = self._futuros.pop(chave, None)
+            if anterior is not None:
+                anterior.cancel()
+
+        kwargs = {}
+        if ao_progresso is not None:
+            kwargs['progresso'] = lambda valor: self._resultados.put(('progresso', ao_progresso, valor))
+
+        futuro = self.executor.submit(funcao, *args, **kwargs)
+        if chave is not None:
+            self._futuros[chave] = futuro
+
+        self._alterar_pendentes(1)
+        self._em_execucao.add(futuro)
+        futuro.add_done_callback(self._em_execucao.discard)
+        futuro.add_done_callback(
+            lambda f: self._resultados.put(('fim', f, (chave, geracao, ao_concluir, ao_falhar)))
+        )
+        self._agendar()
+        return futuro
+
+    def pendente(self, chave):
+        """Indica se a última tarefa com esta chave ainda não entregou o resultado"""
+        return chave in self._futuros
+
+    def geracao(self, chave):
+        """Retorna quantas tarefas já foram agendadas com esta chave"""
+        return self._geracoes.get(chave, 0)
+
+    def _agendar(self):
+        """Agenda a próxima leitura da fila de resultados no loop do Tk"""
+        if self._agendamento is None and not self._encerrado:
+            self._agendamento = self.window.after(self.INTERVALO_MS, self._despachar)
+
+    def _despachar(self):
+        """Entrega os resultados prontos aos callbacks, na thread do Tk"""
+        self._agendamento = None
+
+        try:
+            while True:
+                try:
+                    evento, alvo, dados = self._resultados.get_nowait()
+                except queue.Empty:
+                    break
+
+                if evento == 'progresso':
+                    self._chamar(alvo, dados)
+                    continue
+
+                chave, geracao, ao_concluir, ao_falhar = dados
+                self._alterar_pendentes(-1)
+
+                if chave is not None:
+                    if self._futuros.get(chave) is alvo:
+                        del self._futuros[chave]
+                    # Resultado de uma tarefa já substituída: descartar
+                    if self._geracoes.get(chave) != geracao:
+                        continue
+                if alvo.cancelled():
+                    continue
+
+                erro = alvo.exception()
+                if erro is not None:
+                    if ao_falhar:
+                        self._chamar(ao_falhar, erro)
+                elif ao_concluir:
+                    self._chamar(ao_concluir, alvo.result())
+        finally:
+            if self._pendentes:
+                self._agendar()
+
+    def _chamar(self, callback, valor):
+        """Executa um callback; um erro nele é relatado pelo Tk sem interromper a entrega dos demais"""
+        try:
+            callback(valor)
+        except Exception:
+            self.window.report_callback_exception(*sys.exc_info())
+
+    def _alterar_pendentes(self, delta):
+        self._pendentes += delta
+        if self.ao_mudar_pendentes:
+            self.ao_mudar_pendentes(self._pendentes)
+
+    def encerrar(self):
+        """Cancela as tarefas pendentes e encerra as threads"""
+        self._encerrado = True
+        if self._agendamento is not None:
+            self.window.after_cancel(self._agendamento)
+            self._agendamento = None
+        # shutdown(cancel_futures=True) só existe a partir do Python 3.9
+        for futuro in list(self._em_execucao):
+            futuro.cancel()
+        self.executor.shutdown(wait=False)
@@ -3,6 +3,8 @@ from tkinter import ttk
 from datetime import datetime
 import tkcalendar
 
+from utils.moeda import para_centavos, para_texto
+
 class TransactionForm:
     def __init__(self, parent, db, tipo, transacao=None):
         self.window = tk.Toplevel(parent)
@@ -70,7 +72,7 @@ class TransactionForm:
             self.data_entry.set_date(datetime.strptime(self.transacao[1], '%Y-%m-%d'))
             self.descricao_entry.insert(0, self.transacao[2])
             self.categoria_combo.set(self.transacao[3])
-            self.valor_entry.insert(0, str(self.transacao[4]))
+            self.valor_entry.insert(0, para_texto(self.transacao[4]).replace('.', ','))
         
         # Frame para botões
         botoes_frame = ttk.Frame(main_frame)
@@ -102,46 +104,22 @@ class TransactionForm:
         
     def salvar(self):
         try:
-            data = self.data_entry.get_date()
+            data = self.data_entry.get_date().isoformat()
             descricao = self.descricao_entry.get()
             categoria = self.categoria_combo.get()
-            valor = float(self.valor_entry.get().replace(',', '.'))
+            valor = para_centavos(self.valor_entry.get())
             
             if not descricao or not categoria or valor <= 0:
                 raise ValueError("Preencha todos os campos corretamente")
             
             # Encontrar ID da categoria
-            categorias = self.db.get_categorias(self.tipo)
-            categoria_id = None
-            for cat_id, cat_nome in categorias:
-                if cat_nome == categoria:
-                    categoria_id = cat_id
-                    break
+            categoria_id = self.db.categorias.id(self.tipo, categoria)
             
             if not categoria_id:
                 raise ValueError("Categoria inválida")
             
-            if self.transacao:
-                # Atualizar transação existente
-                self.db.update_transacao(
-                    self.transacao[0],
-                    data,
-                    descricao,
-                    categoria_id,
-                    valor,
-                    self.tipo
-                )
-            else:
-                # Adicionar nova transação
-                self.db.add_transacao(
-                    data,
-                    descricao,
-                    categoria_id,
-                    valor,
-                    self.tipo
-                )
-            
-            self.resultado = True
+            # A gravação fica com a janela principal, fora da thread do Tk
+            self.resultado = (data, descricao, categoria_id, valor, self.tipo)
             self.window.destroy()
             
         except ValueError as e:
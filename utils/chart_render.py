@@ -0,0 +1,166 @@
+"""Renderização dos gráficos fora da tela, no backend Agg.
+
+ChartRenderer guarda a imagem PNG de cada visão já desenhada, pela chave
+(tipo do gráfico, parâmetros, versão dos dados, tamanho): voltar a um
+filtro já exibido apenas troca a imagem na tela. exportar_pacotes gera os
+gráficos de vários meses e bancos de dados em paralelo, sem Tk.
+
+Os tipos de gráfico e seus parâmetros são os argumentos da consulta:
+'fluxo' (ano,), 'distribuicao' (mes, ano) e 'saldo' (inicio, fim).
+"""
+import calendar
+import io
+import os
+import threading
+import time
+
+from database import Database, ResultCache
+from .graph_utils import GraficoFluxoMensal, GraficoDistribuicao, GraficoSaldoAcumulado
+from .paralelo import mapear_em_processos
+
+# Tipo -> (classe do gráfico, consulta do Database que fornece os dados)
+GRAFICOS = {
+    'fluxo': (GraficoFluxoMensal, 'get_fluxo_mensal'),
+    'distribuicao': (GraficoDistribuicao, 'get_distribuicao_despesas'),
+    'saldo': (GraficoSaldoAcumulado, 'get_saldo_acumulado'),
+}
+
+COR_FUNDO = '#f0f0f0'
+DPI = 100
+
+def carregar_dados(db, tipo, params):
+    """Consulta os dados de um gráfico"""
+    return getattr(db, GRAFICOS[tipo][1])(*params)
+
+def _criar_grafico(tipo, largura, altura, dpi=DPI):
+    """Cria uma figura Agg do tamanho indicado, em pixels, com o gráfico do tipo"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(largura / dpi, altura / dpi), dpi=dpi, facecolor=COR_FUNDO)
+    FigureCanvasAgg(fig)
+    return GRAFICOS[tipo][0](fig)
+
+def _desenhar(grafico, tipo, params, dados):
+    """Atualiza o gráfico com os dados; o de fluxo também recebe o ano do título"""
+    if tipo == 'fluxo':
+        grafico.atualizar(dados, params[0])
+    else:
+        grafico.atualizar(dados)
+
+def _salvar(fig, formato):
+    arquivo = io.BytesIO()
+    fig.savefig(arquivo, format=formato, facecolor=fig.get_facecolor())
+    return arquivo.getvalue()
+
+def renderizar(tipo, params, dados, formato='png', largura=600, altura=400, dpi=DPI):
+    """Desenha o gráfico em uma figura nova e retorna o arquivo ('png', 'svg', 'pdf') em bytes"""
+    grafico = _criar_grafico(tipo, largura, altura, dpi)
+    _desenhar(grafico, tipo, params, dados)
+    return _salvar(grafico.fig, formato)
+
+class ChartRenderer:
+    """Rasteriza os gráficos do Database em PNG, com cache das imagens.
+
+    Mantém uma figura por tipo, atualizada no lugar pelas classes de
+    graph_utils, e serializa o desenho com um lock: pode ser usado pelas
+    threads de fundo da interface.
+    """
+
+    def __init__(self, db, max_entradas=64, max_bytes=16 * 1024 * 1024):
+        self.db = db
+        self.cache = ResultCache(max_entradas, max_bytes)
+        self._graficos = {}
+        self._lock = threading.Lock()
+
+    def png(self, tipo, params, tamanho, dados=None):
+        """Retorna a imagem PNG do gráfico em tamanho (largura, altura) pixels.
+
+        Sem dados, consulta o banco; com cache válido, não consulta nem desenha.
+        """
+        # Ler a versão antes dos dados: uma escrita no meio só invalida a imagem
+        chave = (tipo, params, self.db.versao(), tamanho)
+        imagem = self.cache.get(chave)
+        if isinstance(imagem, bytes):
+            return imagem
+
+        if dados is None:
+            dados = carregar_dados(self.db, tipo, params)
+
+        with self._lock:
+            atual = self._graficos.get(tipo)
+            if atual is None or atual[0] != tamanho:
+                atual = (tamanho, _criar_grafico(tipo, *tamanho))
+                self._graficos[tipo] = atual
+            grafico = atual[1]
+            _desenhar(grafico, tipo, params, dados)
+            imagem = _salvar(grafico.fig, 'png')
+
+        self.cache.put(chave, imagem)
+        return imagem
+
+def renderizar_pacote(banco, graficos, formato, largura, altura):
+    """Consulta e grava em arquivo os gráficos (tipo, params, caminho) de um banco.
+
+    Não usa Tk: é executada nos processos de exportar_pacotes.
+    """
+    db = Database(banco)
+    try:
+        for tipo, params, caminho in graficos:
+            conteudo = renderizar(tipo, params, carregar_dados(db, tipo, params), formato, largura, altura)
+            with open(caminho, 'wb') as arquivo:
+                arquivo.write(conteudo)
+    finally:
+        db.close()
+    return len(graficos)
+
+def pacotes_do_ano(banco, ano, destino, formato='png', meses=range(1, 13)):
+    """Lista os pacotes de um banco: o fluxo do ano e, para cada mês, distribuição e saldo.
+
+    Os arquivos ficam em destino/<nome do banco>/.
+    """
+    pasta = os.path.join(destino, os.path.splitext(os.path.basename(banco))[0])
+    os.makedirs(pasta, exist_ok=True)
+
+    pacotes = [[('fluxo', (ano,), os.path.join(pasta, f"{ano}-fluxo.{formato}"))]]
+    for mes in meses:
+        ultimo_dia = calendar.monthrange(ano, mes)[1]
+        prefixo = os.path.join(pasta, f"{ano}-{mes:02d}")
+        pacotes.append([
+            ('distribuicao', (mes, ano), f"{prefixo}-distribuicao.{formato}"),
+            ('saldo', (f"{ano}-{mes:02d}-01", f"{ano}-{mes:02d}-{ultimo_dia:02d}"),
+             f"{prefixo}-saldo.{formato}"),
+        ])
+    return pacotes
+
+def exportar_pacotes(bancos, ano, destino, formato='png', meses=range(1, 13), max_workers=None,
+                     progresso=None, largura=900, altura=600):
+    """Gera os gráficos mensais de um ou mais bancos de dados em paralelo.
+
+    Cada pacote (o fluxo do ano ou os gráficos de um mês) é desenhado por um
+    processo do pool, no backend Agg, abrindo o próprio banco: o desenho é
+    limitado pela CPU e pelo GIL. progresso, se informado, recebe
+    (pacotes concluídos, total de pacotes).
+    """
+    try:
+        inicio = time.perf_counter()
+        tarefas = []
+        for banco in bancos:
+            if not os.path.exists(banco):
+                raise ValueError(f"Banco de dados não encontrado: {banco}")
+            # Aplicar as migrações aqui, e não concorrentemente nos processos
+            Database(banco).close()
+            tarefas.extend((banco, graficos) for graficos in pacotes_do_ano(banco, ano, destino, formato, meses))
+
+        gerados = sum(mapear_em_processos(
+            renderizar_pacote,
+            [(banco, graficos, formato, largura, altura) for banco, graficos in tarefas],
+            max_workers,
+            progresso
+        ))
+
+        duracao = time.perf_counter() - inicio
+        return True, f"{gerados} gráficos de {len(bancos)} bancos gerados em {destino} em {duracao:.2f}s!"
+
+    except Exception as e:
+        return False, f"Erro ao exportar gráficos: {str(e)}"
@@ -0,0 +1,129 @@
+import codecs
+import csv
+import io
+import re
+
+import pandas as pd
+
+from .import_pipeline import TAMANHO_LOTE
+
+EXTENSOES = ('csv', 'txt')
+DESCRICAO = "Arquivos CSV"
+
+# Tipos explícitos evitam a inferência de tipos a cada lote
+TIPOS_COLUNAS = {
+    'Descrição': 'string',
+    'Categoria': 'string',
+    'Tipo': 'string',
+    'Valor': 'float64',
+}
+
+# Bytes lidos do início do arquivo para detectar codificação e separadores
+TAMANHO_AMOSTRA = 1 << 20
+LINHAS_AMOSTRA = 200
+
+# Valores como '1.234' (só ponto, três casas) podem ser milhar ou decimal
+_AMBIGUO = re.compile(r'^-?\d{1,3}(\.\d{3})+$')
+
+def _separador_decimal(valores):
+    """Deduz o separador decimal pelos primeiros valores não ambíguos da coluna Valor"""
+    for valor in valores:
+        texto = valor.replace('R$', '').replace(' ', '').strip()
+        virgula, ponto = texto.rfind(','), texto.rfind('.')
+        if virgula > ponto:
+            return ','
+        if ponto > virgula and not (virgula < 0 and _AMBIGUO.match(texto)):
+            return '.'
+    return '.'
+
+def _detectar_codificacao(amostra):
+    """UTF-8 (com ou sem BOM) ou, se não decodificar, cp1252 (comum em bancos brasileiros)"""
+    try:
+        # final=False: a amostra pode terminar no meio de um caractere
+        codecs.getincrementaldecoder('utf-8-sig')().decode(amostra, final=False)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+def detectar_dialeto(arquivo):
+    """Detecta o separador de colunas, o separador decimal e a codificação.
+
+    A codificação e os separadores vêm do início do arquivo: o separador de
+    colunas, do cabeçalho e da primeira linha; o decimal, dos valores da
+    coluna Valor, já que exportações com ';' entre colunas podem usar tanto
+    '1234,56' quanto '1234.56'.
+    """
+    with open(arquivo, 'rb') as f:
+        amostra = f.read(TAMANHO_AMOSTRA)
+    codificacao = _detectar_codificacao(amostra)
+    texto = amostra.decode(codificacao, errors='ignore')
+    linhas = io.StringIO(texto, newline='').readlines()[:LINHAS_AMOSTRA]
+
+    amostra = ''.join(linhas[:2])
+    separador = ';' if amostra.count(';') > amostra.count(',') else ','
+
+    leitor = csv.reader(linhas, delimiter=separador)
+    cabecalho = next(leitor, [])
+    if 'Valor' not in cabecalho:
+        return separador, '.', codificacao
+    coluna = cabecalho.index('Valor')
+    valores = (linha[coluna] for linha in leitor if len(linha) > coluna and linha[coluna].strip())
+    return separador, _separador_decimal(valores), codificacao
+
+def ler_cabecalho(arquivo):
+    """Lê apenas a linha de cabeçalho do CSV"""
+    separador, _, codificacao = detectar_dialeto(arquivo)
+    with open(arquivo, newline='', encoding=codificacao) as f:
+        return next(csv.reader(f, delimiter=separador), [])
+
+def _pyarrow_disponivel():
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+def _ler_com_pyarrow(arquivo, separador, codificacao, tamanho_lote):
+    """Leitura em blocos pelo leitor CSV multithread do pyarrow"""
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    tipos = {'Descrição': pa.string(), 'Categoria': pa.string(), 'Tipo': pa.string(),
+             'Valor': pa.float64(), 'Data': pa.string()}
+    leitor = pa_csv.open_csv(
+        arquivo,
+        read_options=pa_csv.ReadOptions(
+            block_size=max(tamanho_lote * 128, 1 << 20),
+            # O pyarrow já descarta o BOM do UTF-8
+            encoding='utf8' if codificacao == 'utf-8-sig' else codificacao,
+        ),
+        parse_options=pa_csv.ParseOptions(delimiter=separador),
+        convert_options=pa_csv.ConvertOptions(column_types=tipos),
+    )
+    for lote in leitor:
+        yield lote.to_pandas()
+
+def ler_em_lotes(arquivo, tamanho_lote=TAMANHO_LOTE):
+    """Lê o CSV em DataFrames de até tamanho_lote linhas, com memória constante"""
+    separador, decimal, codificacao = detectar_dialeto(arquivo)
+
+    # O leitor do pyarrow é o mais rápido, mas não trata vírgula decimal
+    if decimal == '.' and _pyarrow_disponivel():
+        yield from _ler_com_pyarrow(arquivo, separador, codificacao, tamanho_lote)
+        return
+
+    colunas = ler_cabecalho(arquivo)
+    yield from pd.read_csv(
+        arquivo,
+        sep=separador,
+        decimal=decimal,
+        thousands='.' if decimal == ',' else None,
+        engine='c',
+        encoding=codificacao,
+        dtype={coluna: tipo for coluna, tipo in TIPOS_COLUNAS.items() if coluna in colunas},
+        chunksize=tamanho_lote,
+    )
+
+def validar(arquivo):
+    """Valida se o CSV é legível lendo apenas o cabeçalho"""
+    return bool(ler_cabecalho(arquivo))
@@ -1,64 +1,63 @@
 import pandas as pd
-from datetime import datetime
-import tkinter as tk
-from tkinter import messagebox
 
-def importar_excel(arquivo, db):
-    """Importa dados de um arquivo Excel para o banco de dados"""
+from .import_pipeline import TAMANHO_LOTE, importar_arquivo, lotes_de_registros
+
+EXTENSOES = ('xlsx', 'xlsm', 'xls')
+DESCRICAO = "Arquivos Excel"
+
+def _extensao(arquivo):
+    return str(arquivo).rsplit('.', 1)[-1].lower()
+
+def ler_cabecalho(arquivo):
+    """Lê apenas a linha de cabeçalho da planilha, sem carregar o restante"""
+    if _extensao(arquivo) == 'xls':
+        # Formato binário antigo: o openpyxl não lê, então usa o pandas
+        return list(pd.read_excel(arquivo, nrows=0).columns)
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(arquivo, read_only=True, data_only=True)
     try:
-        # Ler o arquivo Excel
+        linha = next(workbook.active.iter_rows(max_row=1, values_only=True), ())
+        return [str(valor) for valor in linha if valor is not None]
+    finally:
+        workbook.close()
+
+def ler_em_lotes(arquivo, tamanho_lote=TAMANHO_LOTE):
+    """Lê a planilha em DataFrames de até tamanho_lote linhas, com memória constante"""
+    if _extensao(arquivo) == 'xls':
         df = pd.read_excel(arquivo)
-        
-        # Verificar colunas obrigatórias
-        colunas_obrigatorias = ['Data', 'Descrição', 'Categoria', 'Valor', 'Tipo']
-        colunas_faltantes = [col for col in colunas_obrigatorias if col not in df.columns]
-        
-        if colunas_faltantes:
-            raise ValueError(f"Colunas obrigatórias faltando: {', '.join(colunas_faltantes)}")
-        
-        # Converter tipos de dados
-        df['Data'] = pd.to_datetime(df['Data']).dt.date
-        df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce')
-        
-        # Validar dados
-        if df['Valor'].isna().any():
-            raise ValueError("Valores inválidos encontrados na coluna 'Valor'")
-        
-        if not df['Tipo'].isin(['entrada', 'saida']).all():
-            raise ValueError("Tipo deve ser 'entrada' ou 'saida'")
-        
-        # Inserir dados no banco
-        for _, row in df.iterrows():
-            # Verificar se a categoria existe
-            categorias = db.get_categorias()
-            categoria_id = None
-            for cat_id, cat_nome in categorias:
-                if cat_nome == row['Categoria']:
-                    categoria_id = cat_id
-                    break
-            
-            if not categoria_id:
-                raise ValueError(f"Categoria não encontrada: {row['Categoria']}")
-            
-            # Inserir transação
-            db.add_transacao(
-                data=row['Data'],
-                descricao=row['Descrição'],
-                categoria_id=categoria_id,
-                valor=float(row['Valor']),
-                tipo=row['Tipo']
-            )
-        
-        return True, "Dados importados com sucesso!"
-        
-    except Exception as e:
-        return False, f"Erro ao importar dados: {str(e)}"
+        for inicio in range(0, len(df), tamanho_lote):
+            yield df.iloc[inicio:inicio + tamanho_lote]
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = workbook.active.iter_rows(values_only=True)
+        cabecalho = [str(valor) if valor is not None else '' for valor in next(linhas, ())]
+
+        # Planilhas costumam trazer linhas vazias no final
+        registros = (
+            linha[:len(cabecalho)] for linha in linhas
+            if not all(valor is None for valor in linha)
+        )
+        yield from lotes_de_registros(registros, cabecalho, tamanho_lote)
+    finally:
+        workbook.close()
+
+def validar(arquivo):
+    """Valida se a planilha é legível lendo apenas o cabeçalho"""
+    return bool(ler_cabecalho(arquivo))
+
+def importar_excel(arquivo, db, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Importa dados de um arquivo Excel (ou CSV) para o banco de dados"""
+    return importar_arquivo(arquivo, db, tamanho_lote=tamanho_lote, progresso=progresso)
 
 def validar_arquivo_excel(arquivo):
     """Valida se o arquivo é um Excel válido"""
     try:
-        # Tentar ler o arquivo
-        pd.read_excel(arquivo)
-        return True
+        return validar(arquivo)
     except:
-        return False 
\ No newline at end of file
+        return False
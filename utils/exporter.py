@@ -0,0 +1,138 @@
+"""Exportação das transações filtradas para CSV, XLSX e Parquet.
+
+As linhas vêm de Database.iter_transacoes em lotes e são gravadas à medida
+que chegam, então a memória usada não depende do tamanho do resultado. Os
+arquivos têm as colunas aceitas pelo importador.
+"""
+import csv
+import os
+import time
+from datetime import date
+
+from .moeda import para_texto
+
+COLUNAS = ['Data', 'Descrição', 'Categoria', 'Valor', 'Tipo']
+
+# Linhas lidas do banco por vez (e linhas por row group no Parquet)
+TAMANHO_LOTE = 50000
+
+# Limite de linhas de uma planilha do Excel, contando o cabeçalho
+LINHAS_POR_PLANILHA = 1048576
+
+def _exportar_csv(lotes, arquivo):
+    """Grava CSV com valores decimais exatos ('1234.56')"""
+    with open(arquivo, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(COLUNAS)
+        for lote in lotes:
+            escritor.writerows(
+                (data, descricao, categoria, para_texto(valor), tipo)
+                for data, descricao, categoria, valor, tipo in lote
+            )
+
+def _exportar_xlsx(lotes, arquivo):
+    """Grava XLSX no modo write-only do openpyxl, abrindo novas planilhas ao atingir o limite do Excel"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    planilha = None
+    linhas = LINHAS_POR_PLANILHA
+    for lote in lotes:
+        for data, descricao, categoria, valor, tipo in lote:
+            if linhas >= LINHAS_POR_PLANILHA:
+                numero = len(workbook.worksheets) + 1
+                planilha = workbook.create_sheet("Transações" if numero == 1 else f"Transações {numero}")
+                planilha.append(COLUNAS)
+                linhas = 1
+            planilha.append([date.fromisoformat(data), descricao, categoria, valor / 100, tipo])
+            linhas += 1
+
+    if planilha is None:
+        workbook.create_sheet("Transações").append(COLUNAS)
+    workbook.save(arquivo)
+
+def _exportar_parquet(lotes, arquivo):
+    """Grava Parquet com um row group por lote (requer pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("A exportação para Parquet requer o pacote pyarrow")
+
+    esquema = pa.schema([
+        ('Data', pa.date32()),
+        ('Descrição', pa.string()),
+        ('Categoria', pa.string()),
+        ('Valor', pa.float64()),
+        ('Tipo', pa.string()),
+    ])
+    with pq.ParquetWriter(arquivo, esquema) as escritor:
+        for lote in lotes:
+            datas, descricoes, categorias, valores, tipos = zip(*lote)
+            escritor.write_table(pa.Table.from_arrays([
+                pa.array(datas, pa.string()).cast(pa.date32()),
+                pa.array(descricoes, pa.string()),
+                pa.array(categorias, pa.string()),
+                pc.divide(pa.array(valores, pa.int64()).cast(pa.float64()), 100),
+                pa.array(tipos, pa.string()),
+            ], schema=esquema))
+
+# Formato -> (extensões, função de gravação)
+FORMATOS = {
+    'csv': (('csv',), _exportar_csv),
+    'xlsx': (('xlsx',), _exportar_xlsx),
+    'parquet': (('parquet', 'pq'), _exportar_parquet),
+}
+
+def detectar_formato(arquivo):
+    """Identifica o formato de exportação pela extensão"""
+    extensao = str(arquivo).rsplit('.', 1)[-1].lower()
+    for formato, (extensoes, _) in FORMATOS.items():
+        if extensao in extensoes:
+            return formato
+    raise ValueError(f"Formato de exportação não suportado: .{extensao}")
+
+def tipos_de_arquivo():
+    """Retorna os filtros de extensão para o diálogo de salvar"""
+    descricoes = {'csv': "Arquivos CSV", 'xlsx': "Arquivos Excel", 'parquet': "Arquivos Parquet"}
+    return [
+        (descricoes[formato], ' '.join(f"*.{ext}" for ext in extensoes))
+        for formato, (extensoes, _) in FORMATOS.items()
+    ]
+
+def exportar_transacoes(db, arquivo, mes=None, ano=None, tipo=None, formato=None,
+                        tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Exporta as transações filtradas para CSV, XLSX ou Parquet.
+
+    O arquivo é gravado com outro nome e só substitui o destino ao final,
+    então uma falha não deixa um arquivo pela metade. progresso, se
+    informado, recebe o total de linhas gravadas após cada lote.
+    """
+    temporario = f"{arquivo}.tmp"
+    try:
+        inicio = time.perf_counter()
+        formato = formato or detectar_formato(arquivo)
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de exportação não suportado: {formato}")
+        total = 0
+
+        def lotes():
+            nonlocal total
+            for lote in db.iter_transacoes(mes, ano, tipo, tamanho_lote):
+                yield lote
+                total += len(lote)
+                if progresso:
+                    progresso(total)
+
+        FORMATOS[formato][1](lotes(), temporario)
+        os.replace(temporario, arquivo)
+
+        duracao = time.perf_counter() - inicio
+        taxa = total / duracao if duracao > 0 else total
+        return True, f"{total} transações exportadas para {arquivo} em {duracao:.2f}s ({taxa:,.0f} linhas/s)!"
+
+    except Exception as e:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False, f"Erro ao exportar dados: {str(e)}"
@@ -1,82 +1,260 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from .moeda import de_centavos
+
+# Cores para o gráfico de distribuição
+CORES_DISTRIBUICAO = ['#2ecc71', '#3498db', '#e74c3c', '#f1c40f', '#9b59b6',
+                      '#1abc9c', '#e67e22', '#34495e', '#7f8c8d', '#16a085']
+
+def _mostrar_sem_dados(ax):
+    """Exibe o aviso de ausência de dados no eixo"""
+    ax.text(0.5, 0.5, 'Nenhum dado disponível',
+            horizontalalignment='center',
+            verticalalignment='center',
+            transform=ax.transAxes)
+
+def _congelar(dados):
+    """Converte as linhas de uma consulta em uma chave comparável"""
+    return tuple(tuple(d) for d in dados)
+
+class GraficoFluxoMensal:
+    """Gráfico de barras de entradas e saídas mensais, atualizado no lugar"""
+
+    LARGURA = 0.35
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.ax = fig.add_subplot(111)
+        self._chave = None
+        self._barras = None
+        self._rotulos = []
+
+    def atualizar(self, dados, ano_atual):
+        """Atualiza o gráfico e retorna False quando os dados não mudaram"""
+        chave = (_congelar(dados), ano_atual)
+        if chave == self._chave:
+            return False
+
+        mesmo_formato = (
+            self._barras is not None and self._chave is not None
+            and len(self._chave[0]) == len(dados)
+        )
+        self._chave = chave
+
+        if not dados:
+            self.ax.cla()
+            self._barras = None
+            self._rotulos = []
+            _mostrar_sem_dados(self.ax)
+            return True
+
+        # Preparar dados
+        meses = [d[0] for d in dados]
+        entradas = [de_centavos(d[1]) for d in dados]
+        saidas = [de_centavos(d[2]) for d in dados]
+
+        if mesmo_formato:
+            # Mesma quantidade de meses: só alturas e textos mudam
+            barras = list(self._barras[0]) + list(self._barras[1])
+            for barra, altura in zip(barras, entradas + saidas):
+                barra.set_height(altura)
+            for rotulo, barra in zip(self._rotulos, barras):
+                self._posicionar_rotulo(rotulo, barra)
+            self.ax.set_xticklabels([m.split('-')[1] for m in meses], rotation=45)
+            self.ax.set_title(f'Fluxo de Caixa Mensal - {ano_atual}')
+            self.ax.relim()
+            self.ax.autoscale_view()
+            return True
+
+        self._construir(meses, entradas, saidas, ano_atual)
+        return True
+
+    def _construir(self, meses, entradas, saidas, ano_atual):
+        """Cria barras, eixos e rótulos do zero"""
+        ax = self.ax
+        ax.cla()
+
+        # Criar barras
+        x = np.arange(len(meses))
+        width = self.LARGURA
+
+        self._barras = (
+            ax.bar(x - width/2, entradas, width, label='Entradas', color='#2ecc71', alpha=0.7),
+            ax.bar(x + width/2, saidas, width, label='Saídas', color='#e74c3c', alpha=0.7),
+        )
+
+        # Configurar eixos
+        ax.set_xlabel('Mês')
+        ax.set_ylabel('Valor (R$)')
+        ax.set_title(f'Fluxo de Caixa Mensal - {ano_atual}')
+        ax.set_xticks(x)
+        ax.set_xticklabels([m.split('-')[1] for m in meses], rotation=45)
+
+        # Adicionar grid e legenda
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+
+        # Adicionar valores nas barras
+        self._rotulos = []
+        for barra in list(self._barras[0]) + list(self._barras[1]):
+            rotulo = ax.text(0, 0, '', ha='center', va='bottom')
+            self._posicionar_rotulo(rotulo, barra)
+            self._rotulos.append(rotulo)
+
+        # Ajustar layout apenas quando a estrutura muda
+        self.fig.tight_layout()
+
+    @staticmethod
+    def _posicionar_rotulo(rotulo, barra):
+        altura = barra.get_height()
+        rotulo.set_position((barra.get_x() + barra.get_width()/2., altura))
+        rotulo.set_text(f'R$ {altura:,.0f}')
+
+class GraficoDistribuicao:
+    """Gráfico de pizza da distribuição de despesas, atualizado no lugar"""
+
+    DISTANCIA_ROTULO = 1.1
+    DISTANCIA_PERCENTUAL = 0.6
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.ax = fig.add_subplot(111)
+        self._chave = None
+        self._fatias = None
+        self._textos = None
+        self._percentuais = None
+
+    def atualizar(self, dados):
+        """Atualiza o gráfico e retorna False quando os dados não mudaram"""
+        chave = _congelar(dados)
+        if chave == self._chave:
+            return False
+
+        mesmo_formato = (
+            self._fatias is not None and self._chave is not None
+            and len(self._chave) == len(dados)
+        )
+        self._chave = chave
+
+        if not dados:
+            self.ax.cla()
+            self._fatias = None
+            _mostrar_sem_dados(self.ax)
+            return True
+
+        # Preparar dados
+        categorias = [d[0] for d in dados]
+        valores = [de_centavos(d[1]) for d in dados]
+
+        if mesmo_formato:
+            self._reposicionar(categorias, valores)
+            return True
+
+        ax = self.ax
+        ax.cla()
+
+        # Criar gráfico de pizza
+        self._fatias, self._textos, self._percentuais = ax.pie(
+            valores, labels=categorias, autopct='%1.1f%%', colors=CORES_DISTRIBUICAO,
+            labeldistance=self.DISTANCIA_ROTULO, pctdistance=self.DISTANCIA_PERCENTUAL
+        )
+
+        # Configurar título
+        ax.set_title('Distribuição de Despesas por Categoria')
+
+        # Ajustar layout apenas quando a estrutura muda
+        self.fig.tight_layout()
+        return True
+
+    def _reposicionar(self, categorias, valores):
+        """Recalcula ângulos das fatias e posição dos textos, como faz ax.pie"""
+        valores = np.asarray(valores, dtype=float)
+        total = valores.sum()
+        fracoes = valores / total if total else np.zeros_like(valores)
+
+        theta1 = 0.0
+        for fatia, texto, percentual, categoria, fracao in zip(
+            self._fatias, self._textos, self._percentuais, categorias, fracoes
+        ):
+            theta2 = theta1 + fracao
+            fatia.set_theta1(360 * theta1)
+            fatia.set_theta2(360 * theta2)
+
+            meio = np.pi * (theta1 + theta2)
+            x, y = np.cos(meio), np.sin(meio)
+
+            texto.set_position((self.DISTANCIA_ROTULO * x, self.DISTANCIA_ROTULO * y))
+            texto.set_text(categoria)
+            texto.set_horizontalalignment('left' if x > 0 else 'right')
+
+            percentual.set_position((self.DISTANCIA_PERCENTUAL * x, self.DISTANCIA_PERCENTUAL * y))
+            percentual.set_text(f'{100 * fracao:1.1f}%')
+
+            theta1 = theta2
+
+class GraficoSaldoAcumulado:
+    """Gráfico de linha do saldo acumulado ao fim de cada dia, atualizado no lugar"""
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.ax = fig.add_subplot(111)
+        self._chave = None
+        self._linha = None
+
+    def atualizar(self, dados):
+        """Atualiza o gráfico com linhas (dia 'AAAA-MM-DD', saldo em centavos) e
+        retorna False quando os dados não mudaram"""
+        chave = _congelar(dados)
+        if chave == self._chave:
+            return False
+        self._chave = chave
+
+        if not dados:
+            self.ax.cla()
+            self._linha = None
+            _mostrar_sem_dados(self.ax)
+            return True
+
+        dias = np.array([d[0] for d in dados], dtype='datetime64[D]')
+        saldos = np.array([d[1] for d in dados], dtype=np.int64) / 100
+
+        if self._linha is not None:
+            # Só os pontos mudam: eixos, título e formatação são mantidos
+            self._linha.set_data(dias, saldos)
+            self.ax.relim()
+            self.ax.autoscale_view()
+            return True
+
+        from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+
+        ax = self.ax
+        ax.cla()
+        self._linha, = ax.plot(dias, saldos, color='#3498db', linewidth=1.5, drawstyle='steps-post')
+        ax.axhline(0, color='#7f8c8d', linewidth=0.8)
+
+        localizador = AutoDateLocator()
+        ax.xaxis.set_major_locator(localizador)
+        ax.xaxis.set_major_formatter(ConciseDateFormatter(localizador))
+
+        ax.set_ylabel('Saldo (R$)')
+        ax.set_title('Saldo Acumulado')
+        ax.grid(True, alpha=0.3)
+
+        # Ajustar layout apenas quando a estrutura muda
+        self.fig.tight_layout()
+        return True
 
 def criar_grafico_fluxo_mensal(fig, dados, ano_atual):
     """Cria o gráfico de fluxo mensal"""
-    plt.clf()
-    ax = fig.add_subplot(111)
-    
-    if not dados:
-        ax.text(0.5, 0.5, 'Nenhum dado disponível', 
-                horizontalalignment='center', 
-                verticalalignment='center',
-                transform=ax.transAxes)
-        return
-    
-    # Preparar dados
-    meses = [d[0] for d in dados]
-    entradas = [d[1] for d in dados]
-    saidas = [d[2] for d in dados]
-    
-    # Criar barras
-    x = np.arange(len(meses))
-    width = 0.35
-    
-    ax.bar(x - width/2, entradas, width, label='Entradas', color='#2ecc71', alpha=0.7)
-    ax.bar(x + width/2, saidas, width, label='Saídas', color='#e74c3c', alpha=0.7)
-    
-    # Configurar eixos
-    ax.set_xlabel('Mês')
-    ax.set_ylabel('Valor (R$)')
-    ax.set_title(f'Fluxo de Caixa Mensal - {ano_atual}')
-    ax.set_xticks(x)
-    ax.set_xticklabels([m.split('-')[1] for m in meses], rotation=45)
-    
-    # Adicionar grid e legenda
-    ax.grid(True, alpha=0.3)
-    ax.legend()
-    
-    # Adicionar valores nas barras
-    def add_value_labels(bars):
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'R$ {height:,.0f}',
-                   ha='center', va='bottom')
-    
-    add_value_labels(ax.patches)
-    
-    # Ajustar layout
-    fig.tight_layout()
+    fig.clf()
+    GraficoFluxoMensal(fig).atualizar(dados, ano_atual)
 
 def criar_grafico_distribuicao(fig, dados):
     """Cria o gráfico de distribuição de despesas"""
-    plt.clf()
-    ax = fig.add_subplot(111)
-    
-    if not dados:
-        ax.text(0.5, 0.5, 'Nenhum dado disponível', 
-                horizontalalignment='center', 
-                verticalalignment='center',
-                transform=ax.transAxes)
-        return
-    
-    # Preparar dados
-    categorias = [d[0] for d in dados]
-    valores = [d[1] for d in dados]
-    
-    # Cores para o gráfico
-    cores = ['#2ecc71', '#3498db', '#e74c3c', '#f1c40f', '#9b59b6', 
-             '#1abc9c', '#e67e22', '#34495e', '#7f8c8d', '#16a085']
-    
-    # Criar gráfico de pizza
-    patches, texts, autotexts = ax.pie(valores, labels=categorias, 
-                                     autopct='%1.1f%%', colors=cores)
-    
-    # Configurar título
-    ax.set_title('Distribuição de Despesas por Categoria')
-    
-    # Ajustar layout
-    fig.tight_layout() 
\ No newline at end of file
+    fig.clf()
+    GraficoDistribuicao(fig).atualizar(dados)
+
+def criar_grafico_saldo_acumulado(fig, dados):
+    """Cria o gráfico de saldo acumulado"""
+    fig.clf()
+    GraficoSaldoAcumulado(fig).atualizar(dados)
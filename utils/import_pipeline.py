@@ -0,0 +1,316 @@
+import importlib
+import os
+import time
+from contextlib import ExitStack, closing
+
+import pandas as pd
+
+from database import hash_transacao
+from .moeda import serie_para_centavos
+from .paralelo import executar_em_processos
+
+COLUNAS_OBRIGATORIAS = ['Data', 'Descrição', 'Categoria', 'Valor', 'Tipo']
+
+# Linhas lidas, validadas e gravadas por vez durante a importação
+TAMANHO_LOTE = 5000
+
+# Formato -> módulo do plugin. Cada plugin define EXTENSOES, DESCRICAO,
+# validar(arquivo) e ler_em_lotes(arquivo, tamanho_lote), que produz
+# DataFrames com as colunas Data, Descrição, Valor e, quando houver,
+# Categoria e Tipo. Extratos bancários definem USAR_CATEGORIA_PADRAO.
+# Plugins que leem registro a registro usam lotes_de_registros.
+FORMATOS = {
+    'excel': 'utils.excel_importer',
+    'csv': 'utils.csv_importer',
+    'ofx': 'utils.ofx_importer',
+    'qif': 'utils.qif_importer',
+}
+
+# Categorias usadas quando o arquivo não traz uma (a primeira existente vale)
+CATEGORIAS_PADRAO = {
+    'entrada': ('Outros', 'Outras Receitas'),
+    'saida': ('Outros', 'Outras Despesas'),
+}
+
+def decodificar_linha(linha):
+    """Decodifica uma linha em UTF-8, caindo para cp1252 (comum em bancos brasileiros)"""
+    try:
+        return linha.decode('utf-8')
+    except UnicodeDecodeError:
+        return linha.decode('cp1252', errors='replace')
+
+def lotes_de_registros(registros, colunas, tamanho_lote=TAMANHO_LOTE):
+    """Agrupa as tuplas lidas por um plugin em DataFrames de até tamanho_lote linhas"""
+    lote = []
+    for registro in registros:
+        lote.append(registro)
+        if len(lote) >= tamanho_lote:
+            yield pd.DataFrame.from_records(lote, columns=colunas)
+            lote = []
+    if lote:
+        yield pd.DataFrame.from_records(lote, columns=colunas)
+
+def carregar_plugin(formato):
+    """Importa o módulo do plugin de um formato"""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato não suportado: {formato}")
+    return importlib.import_module(FORMATOS[formato])
+
+def detectar_formato(arquivo):
+    """Identifica o formato do arquivo pela extensão"""
+    extensao = str(arquivo).rsplit('.', 1)[-1].lower()
+    for formato in FORMATOS:
+        if extensao in carregar_plugin(formato).EXTENSOES:
+            return formato
+    raise ValueError(f"Formato de arquivo não suportado: .{extensao}")
+
+def tipos_de_arquivo():
+    """Retorna os filtros de extensão para o diálogo de seleção de arquivos"""
+    plugins = [carregar_plugin(formato) for formato in FORMATOS]
+    todas = ' '.join(f"*.{ext}" for plugin in plugins for ext in plugin.EXTENSOES)
+    return [("Todos os formatos suportados", todas)] + [
+        (plugin.DESCRICAO, ' '.join(f"*.{ext}" for ext in plugin.EXTENSOES)) for plugin in plugins
+    ]
+
+def validar_arquivo(arquivo, formato=None):
+    """Valida se o arquivo é legível no formato indicado (ou detectado)"""
+    try:
+        return carregar_plugin(formato or detectar_formato(arquivo)).validar(arquivo)
+    except Exception:
+        return False
+
+def mapa_categorias(db):
+    """Retorna o mapa (tipo, nome) -> id do índice de categorias do banco"""
+    return db.categorias.mapa()
+
+def _categoria_padrao(categorias, tipo):
+    for nome in CATEGORIAS_PADRAO[tipo]:
+        if (tipo, nome) in categorias:
+            return nome
+    raise ValueError(f"Nenhuma categoria padrão de {tipo} cadastrada ({', '.join(CATEGORIAS_PADRAO[tipo])})")
+
+def normalizar(df, categorias, usar_categoria_padrao=False):
+    """Completa Tipo e Categoria ausentes, como em extratos bancários.
+
+    Sem coluna Tipo, o sinal do valor define entrada ou saída e o valor
+    passa a ser absoluto. Sem Categoria, usa a categoria padrão do tipo.
+    """
+    df = df.copy()
+
+    if 'Tipo' not in df.columns:
+        valores = pd.to_numeric(df['Valor'], errors='coerce')
+        df['Tipo'] = valores.map(lambda v: 'saida' if v < 0 else 'entrada')
+        df['Valor'] = valores.abs()
+
+    if usar_categoria_padrao:
+        if 'Categoria' not in df.columns:
+            df['Categoria'] = None
+        desconhecidas = ~pd.Series(
+            [chave in categorias for chave in zip(df['Tipo'], df['Categoria'])], index=df.index
+        )
+        for tipo in ('entrada', 'saida'):
+            mascara = desconhecidas & (df['Tipo'] == tipo)
+            if mascara.any():
+                df.loc[mascara, 'Categoria'] = _categoria_padrao(categorias, tipo)
+
+    return df
+
+def converter_datas(serie):
+    """Converte a coluna Data, lendo textos fora do ISO com o dia primeiro (dd/mm/aaaa)"""
+    datas = pd.to_datetime(serie, format='%Y-%m-%d', errors='coerce')
+    # Primeiro com o formato inferido do primeiro valor (rápido), depois valor a valor
+    for formato in (None, 'mixed'):
+        restantes = datas.isna() & serie.notna()
+        if not restantes.any():
+            break
+        datas[restantes] = pd.to_datetime(
+            serie[restantes].astype(str), format=formato, dayfirst=True, errors='coerce'
+        )
+    return datas
+
+def preparar_transacoes(df, categorias):
+    """Valida e converte o DataFrame em tuplas prontas para inserção (valores em centavos)"""
+    # Verificar colunas obrigatórias
+    colunas_faltantes = [col for col in COLUNAS_OBRIGATORIAS if col not in df.columns]
+
+    if colunas_faltantes:
+        raise ValueError(f"Colunas obrigatórias faltando: {', '.join(colunas_faltantes)}")
+
+    # Converter tipos de dados
+    datas = converter_datas(df['Data'])
+    valores = pd.to_numeric(df['Valor'], errors='coerce')
+
+    # Validar dados
+    if datas.isna().any():
+        raise ValueError("Datas inválidas encontradas na coluna 'Data'")
+
+    if valores.isna().any():
+        raise ValueError("Valores inválidos encontrados na coluna 'Valor'")
+
+    if not df['Tipo'].isin(['entrada', 'saida']).all():
+        raise ValueError("Tipo deve ser 'entrada' ou 'saida'")
+
+    # Resolver categorias de uma vez pelo par (tipo, nome)
+    chaves = pd.Series(list(zip(df['Tipo'], df['Categoria'])), index=df.index)
+    categoria_ids = chaves.map(categorias)
+
+    faltantes = categoria_ids.isna()
+    if faltantes.any():
+        raise ValueError(f"Categoria não encontrada: {df.loc[faltantes, 'Categoria'].iloc[0]}")
+
+    return list(zip(
+        datas.dt.strftime('%Y-%m-%d').tolist(),
+        df['Descrição'].fillna('').astype(str).tolist(),
+        categoria_ids.astype(int).tolist(),
+        serie_para_centavos(valores.astype(float)).tolist(),
+        df['Tipo'].tolist()
+    ))
+
+def adicionar_hashes(transacoes, ocorrencias):
+    """Acrescenta a cada tupla o hash do conteúdo, numerando linhas idênticas.
+
+    ocorrencias é compartilhado entre os lotes (e arquivos) de uma mesma
+    importação. As contagens são indexadas pelo hash da primeira ocorrência
+    (16 bytes), e não pelo conteúdo da linha, para caber na memória em
+    arquivos de milhões de linhas.
+    """
+    resultado = []
+    for data, descricao, categoria_id, valor, tipo in transacoes:
+        chave = hash_transacao(data, descricao, valor, tipo)
+        ocorrencia = ocorrencias.get(chave, 0)
+        ocorrencias[chave] = ocorrencia + 1
+        if ocorrencia:
+            chave = hash_transacao(data, descricao, valor, tipo, ocorrencia)
+        resultado.append((data, descricao, categoria_id, valor, tipo, chave))
+    return resultado
+
+def importar_arquivo(arquivo, db, formato=None, tamanho_lote=TAMANHO_LOTE, progresso=None,
+                     duplicadas='ignorar'):
+    """Importa um arquivo de qualquer formato suportado para o banco de dados.
+
+    Etapas: leitura em lotes pelo plugin -> normalização -> resolução de
+    categorias -> inserção em massa. Tudo acontece em uma única transação,
+    então um erro em qualquer lote desfaz a importação inteira. progresso,
+    se informado, recebe o total de linhas processadas após cada lote.
+
+    duplicadas define o que fazer com linhas já importadas antes:
+    'ignorar' (padrão), 'atualizar' a categoria, ou None para inserir
+    tudo novamente.
+    """
+    try:
+        inicio = time.perf_counter()
+        plugin = carregar_plugin(formato or detectar_formato(arquivo))
+        usar_categoria_padrao = getattr(plugin, 'USAR_CATEGORIA_PADRAO', False)
+
+        categorias = mapa_categorias(db)
+        ocorrencias = {}
+        total = 0
+        gravadas = 0
+
+        # Inserir tudo em uma única transação (tudo ou nada)
+        with db.transacao():
+            for lote in plugin.ler_em_lotes(arquivo, tamanho_lote):
+                lote = normalizar(lote, categorias, usar_categoria_padrao)
+                transacoes = preparar_transacoes(lote, categorias)
+                if duplicadas:
+                    transacoes = adicionar_hashes(transacoes, ocorrencias)
+                gravadas += db.add_transacoes_bulk(transacoes, duplicadas)
+                total += len(transacoes)
+                if progresso:
+                    progresso(total)
+
+        duracao = time.perf_counter() - inicio
+        taxa = total / duracao if duracao > 0 else total
+        mensagem = f"{gravadas} transações importadas com sucesso em {duracao:.2f}s ({taxa:,.0f} linhas/s)!"
+        if gravadas < total:
+            mensagem += f" {total - gravadas} linhas já existentes foram ignoradas."
+        return True, mensagem
+
+    except Exception as e:
+        return False, f"Erro ao importar dados: {str(e)}"
+
+def listar_arquivos(caminhos):
+    """Expande diretórios nos arquivos de formatos suportados que eles contêm"""
+    extensoes = {ext for formato in FORMATOS for ext in carregar_plugin(formato).EXTENSOES}
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos.extend(sorted(
+                os.path.join(caminho, nome) for nome in os.listdir(caminho)
+                if nome.rsplit('.', 1)[-1].lower() in extensoes
+            ))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+def ler_arquivo(arquivo, categorias, formato=None):
+    """Lê, normaliza e valida um arquivo inteiro, retornando as tuplas para inserção.
+
+    Não acessa o banco: é executada nos processos de importar_arquivos. Os
+    hashes ficam com o escritor, que numera as linhas idênticas do lote todo.
+    """
+    plugin = carregar_plugin(formato or detectar_formato(arquivo))
+    usar_categoria_padrao = getattr(plugin, 'USAR_CATEGORIA_PADRAO', False)
+
+    transacoes = []
+    for lote in plugin.ler_em_lotes(arquivo, TAMANHO_LOTE):
+        lote = normalizar(lote, categorias, usar_categoria_padrao)
+        transacoes.extend(preparar_transacoes(lote, categorias))
+    return transacoes
+
+def importar_arquivos(caminhos, db, max_workers=None, progresso=None, duplicadas='ignorar'):
+    """Importa vários arquivos (ou diretórios) de uma vez.
+
+    A leitura e a validação de cada arquivo rodam em paralelo em um pool de
+    processos, já que o parsing (principalmente de Excel) é limitado pela
+    CPU e pelo GIL. Um único escritor grava cada arquivo assim que ele fica
+    pronto e o descarta em seguida, tudo em uma só transação, aberta quando
+    o primeiro arquivo termina: um arquivo com erro desfaz a importação
+    inteira. As linhas idênticas são numeradas no lote todo; como o hash
+    não depende do arquivo de origem, linhas repetidas em arquivos
+    diferentes são mantidas e reimportar o mesmo lote continua sem efeito,
+    qualquer que seja a ordem de conclusão. progresso, se informado,
+    recebe (arquivos concluídos, total de arquivos).
+    """
+    arquivo = None
+    try:
+        inicio = time.perf_counter()
+        arquivos = sorted(listar_arquivos(caminhos))
+        if not arquivos:
+            raise ValueError("Nenhum arquivo de formato suportado encontrado")
+
+        categorias = mapa_categorias(db)
+        ocorrencias = {}
+        total = 0
+        gravadas = 0
+
+        lidos = executar_em_processos(ler_arquivo, [(arquivo, categorias) for arquivo in arquivos], max_workers)
+        try:
+            with closing(lidos), ExitStack() as transacao:
+                for concluidos, (indice, transacoes) in enumerate(lidos, start=1):
+                    arquivo = arquivos[indice]
+                    # Bloquear o banco só quando houver o que gravar
+                    if concluidos == 1:
+                        transacao.enter_context(db.transacao())
+                    if duplicadas:
+                        transacoes = adicionar_hashes(transacoes, ocorrencias)
+                    gravadas += db.add_transacoes_bulk(transacoes, duplicadas)
+                    total += len(transacoes)
+                    if progresso:
+                        progresso((concluidos, len(arquivos)))
+        except Exception as erro:
+            if hasattr(erro, 'indice'):
+                arquivo = arquivos[erro.indice]
+            raise
+
+        duracao = time.perf_counter() - inicio
+        taxa = total / duracao if duracao > 0 else total
+        mensagem = (f"{gravadas} transações de {len(arquivos)} arquivos importadas com sucesso "
+                    f"em {duracao:.2f}s ({taxa:,.0f} linhas/s)!")
+        if gravadas < total:
+            mensagem += f" {total - gravadas} linhas já existentes foram ignoradas."
+        return True, mensagem
+
+    except Exception as e:
+        origem = f" ({os.path.basename(arquivo)})" if arquivo else ""
+        return False, f"Erro ao importar dados{origem}: {str(e)}"
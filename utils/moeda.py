@@ -0,0 +1,60 @@
+"""Conversão entre reais e centavos.
+
+Valores são guardados e somados como centavos inteiros (exatos); estas
+funções fazem a conversão nas bordas: formulários, importação, exibição
+e gráficos.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+def para_centavos(valor):
+    """Converte reais em centavos inteiros, arredondando meio centavo para cima.
+
+    Aceita números e textos como '1234.56', '1234,56', '1.234,56' ou 'R$ 10'.
+    """
+    if isinstance(valor, int):
+        return valor * 100
+
+    texto = str(valor).replace('R$', '').replace(' ', '').strip()
+    if ',' in texto:
+        # Formato brasileiro: ponto separa milhares, vírgula separa decimais
+        texto = texto.replace('.', '').replace(',', '.')
+
+    try:
+        reais = Decimal(texto)
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: {valor}")
+    if not reais.is_finite():
+        raise ValueError(f"Valor inválido: {valor}")
+
+    return int((reais * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+def serie_para_centavos(valores):
+    """Converte uma Series (ou array) numérica em reais para centavos int64.
+
+    Segue a regra de para_centavos: meio centavo arredonda para longe do
+    zero. O produto é antes arredondado a 6 casas, para descartar o erro de
+    representação do float (1.005 * 100 = 100.49999999999999).
+    """
+    # Importado aqui: a interface e a CLI usam o módulo sem precisar do NumPy
+    import numpy as np
+
+    centavos = np.round(np.abs(valores) * 100, 6)
+    return (np.sign(valores) * np.floor(centavos + 0.5)).astype('int64')
+
+def de_centavos(centavos):
+    """Converte centavos em reais (float), para gráficos e cálculos aproximados"""
+    return centavos / 100
+
+def para_texto(centavos):
+    """Representa centavos como texto decimal sem separador de milhar, ex.: '-1234.56'"""
+    centavos = int(centavos)
+    sinal = '-' if centavos < 0 else ''
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{reais}.{resto:02d}"
+
+def formatar(centavos):
+    """Formata centavos para exibição, ex.: 'R$ 1,234.56'"""
+    centavos = int(centavos)
+    sinal = '-' if centavos < 0 else ''
+    reais, resto = divmod(abs(centavos), 100)
+    return f"R$ {sinal}{reais:,}.{resto:02d}"
@@ -0,0 +1,53 @@
+import re
+
+from .import_pipeline import TAMANHO_LOTE, decodificar_linha, lotes_de_registros
+
+EXTENSOES = ('ofx',)
+DESCRICAO = "Extratos OFX"
+
+# Extratos não trazem categoria: usa a categoria padrão de cada tipo
+USAR_CATEGORIA_PADRAO = True
+
+# Funciona tanto no OFX 1.x (SGML, tags sem fechamento) quanto no 2.x (XML)
+_TAG = re.compile(r'<(/?)(\w+)>([^<\r\n]*)')
+
+def _data_ofx(texto):
+    """Converte AAAAMMDD[HHMMSS[.XXX]][[-3:BRT]] em AAAA-MM-DD"""
+    texto = texto.strip()
+    return f"{texto[0:4]}-{texto[4:6]}-{texto[6:8]}"
+
+def _valor_ofx(texto):
+    """Converte o valor do OFX, aceitando vírgula como separador decimal"""
+    return float(texto.strip().replace(',', '.'))
+
+def ler_transacoes(arquivo):
+    """Percorre o extrato e produz uma tupla (data, descrição, valor) por lançamento"""
+    transacao = None
+    with open(arquivo, 'rb') as f:
+        for linha in f:
+            for fechamento, tag, valor in _TAG.findall(decodificar_linha(linha)):
+                tag = tag.upper()
+                if tag == 'STMTTRN':
+                    if transacao:
+                        yield _converter(transacao)
+                    transacao = None if fechamento else {}
+                elif transacao is not None and not fechamento and valor.strip():
+                    transacao.setdefault(tag, valor.strip())
+
+    # OFX em SGML pode omitir o fechamento do último lançamento
+    if transacao:
+        yield _converter(transacao)
+
+def _converter(transacao):
+    descricao = transacao.get('MEMO') or transacao.get('NAME') or transacao.get('FITID', '')
+    return _data_ofx(transacao['DTPOSTED']), descricao, _valor_ofx(transacao['TRNAMT'])
+
+def ler_em_lotes(arquivo, tamanho_lote=TAMANHO_LOTE):
+    """Lê o extrato em DataFrames de até tamanho_lote lançamentos"""
+    return lotes_de_registros(ler_transacoes(arquivo), ['Data', 'Descrição', 'Valor'], tamanho_lote)
+
+def validar(arquivo):
+    """Valida se o arquivo parece um extrato OFX lendo apenas o início"""
+    with open(arquivo, 'rb') as f:
+        inicio = f.read(4096).upper()
+    return b'OFXHEADER' in inicio or b'<OFX>' in inicio
@@ -0,0 +1,67 @@
+"""Execução de tarefas limitadas pela CPU em um pool de processos.
+
+Usado pela importação de vários arquivos e pela exportação de gráficos:
+o parsing e o desenho são limitados pelo GIL, então threads não ajudam.
+"""
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+def executar_em_processos(funcao, argumentos, max_workers=None):
+    """Executa funcao(*args) para cada tupla de argumentos, produzindo (índice, resultado).
+
+    Os resultados saem na ordem em que as tarefas terminam, e o gerador
+    não guarda os já entregues. Só max_workers + 1 tarefas ficam submetidas
+    por vez: com um consumidor mais lento que os processos, os resultados
+    prontos não se acumulam na memória. Na primeira falha, ou se o gerador
+    for fechado antes do fim, as tarefas ainda não iniciadas são canceladas;
+    a exceção é propagada com o atributo indice, a posição dos argumentos
+    da tarefa que falhou.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    pendentes = enumerate(argumentos)
+    futuros = {}
+
+    # 'spawn' evita herdar por fork o estado do Tk e das threads da interface
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers, mp_context=contexto) as executor:
+        def submeter(quantidade):
+            for indice, args in itertools.islice(pendentes, quantidade):
+                futuros[executor.submit(funcao, *args)] = indice
+
+        try:
+            submeter(max_workers + 1)
+            while futuros:
+                prontos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    indice = futuros.pop(futuro)
+                    try:
+                        resultado = futuro.result()
+                    except Exception as erro:
+                        erro.indice = indice
+                        raise
+                    # Repor a tarefa antes de entregar, para os processos seguirem ocupados
+                    submeter(1)
+                    yield indice, resultado
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+
+def mapear_em_processos(funcao, argumentos, max_workers=None, progresso=None):
+    """Executa funcao(*args) para cada tupla de argumentos e retorna os resultados na mesma ordem.
+
+    progresso, se informado, recebe (tarefas concluídas, total) à medida
+    que terminam. Erros se comportam como em executar_em_processos.
+    """
+    argumentos = list(argumentos)
+    resultados = [None] * len(argumentos)
+    tarefas = executar_em_processos(funcao, argumentos, max_workers)
+    try:
+        for concluidas, (indice, resultado) in enumerate(tarefas, start=1):
+            resultados[indice] = resultado
+            if progresso:
+                progresso((concluidas, len(argumentos)))
+    finally:
+        tarefas.close()
+    return resultados
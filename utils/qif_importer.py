@@ -0,0 +1,59 @@
+import re
+
+from .import_pipeline import TAMANHO_LOTE, decodificar_linha, lotes_de_registros
+
+EXTENSOES = ('qif',)
+DESCRICAO = "Extratos QIF"
+
+# Categorias do QIF que não existirem no banco caem na categoria padrão
+USAR_CATEGORIA_PADRAO = True
+
+def _data_qif(texto):
+    """Converte datas QIF (DD/MM/AAAA, DD/MM'AA, DD-MM-AA) em AAAA-MM-DD.
+
+    O dia vem primeiro, como nos extratos de bancos brasileiros.
+    """
+    dia, mes, ano = (int(parte) for parte in re.split(r"[/'\-.]", texto.replace(' ', '')))
+    if ano < 100:
+        ano += 2000
+    return f"{ano:04d}-{mes:02d}-{dia:02d}"
+
+def _valor_qif(texto):
+    """Converte valores como 1,234.56 ou 1.234,56"""
+    texto = texto.strip()
+    if texto.rfind(',') > texto.rfind('.'):
+        texto = texto.replace('.', '').replace(',', '.')
+    return float(texto.replace(',', ''))
+
+def ler_transacoes(arquivo):
+    """Percorre o extrato e produz uma tupla (data, descrição, valor, categoria) por lançamento"""
+    registro = {}
+    with open(arquivo, 'rb') as f:
+        for linha in f:
+            linha = decodificar_linha(linha).strip()
+            if not linha or linha.startswith('!'):
+                continue
+
+            codigo, valor = linha[0], linha[1:].strip()
+            if codigo == '^':
+                if 'D' in registro and 'T' in registro:
+                    yield (
+                        _data_qif(registro['D']),
+                        registro.get('P') or registro.get('M', ''),
+                        _valor_qif(registro['T']),
+                        # Subcategorias vêm como Categoria:Sub
+                        registro['L'].split(':')[0] if registro.get('L') else None,
+                    )
+                registro = {}
+            else:
+                registro.setdefault(codigo, valor)
+
+def ler_em_lotes(arquivo, tamanho_lote=TAMANHO_LOTE):
+    """Lê o extrato em DataFrames de até tamanho_lote lançamentos"""
+    return lotes_de_registros(ler_transacoes(arquivo), ['Data', 'Descrição', 'Valor', 'Categoria'], tamanho_lote)
+
+def validar(arquivo):
+    """Valida se o arquivo parece um extrato QIF lendo apenas o início"""
+    with open(arquivo, 'rb') as f:
+        inicio = f.read(1024).lstrip()
+    return inicio.startswith(b'!Type:') or inicio.startswith(b'!Account')
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Códigos da coluna tipo
+TIPOS = ('entrada', 'saida')
+ENTRADA, SAIDA = 0, 1
+
+# Layout de uma linha lida do banco: (id, dias desde 1970-01-01, categoria_id, centavos, código do tipo)
+_LINHA = np.dtype([
+    ('id', 'i8'),
+    ('dia', 'i8'),
+    ('categoria_id', 'i8'),
+    ('valor', 'i8'),
+    ('tipo', 'i1'),
+])
+
+def _somar_grupos(chaves, valores):
+    """Soma valores por chave em arrays já ordenados pela chave; retorna (chaves únicas, somas)"""
+    if len(chaves) == 0:
+        return chaves[:0], valores[:0]
+    inicios = np.concatenate(([0], np.flatnonzero(chaves[1:] != chaves[:-1]) + 1))
+    return chaves[inicios], np.add.reduceat(valores, inicios)
+
+class TransactionFrame:
+    """Transações em colunas NumPy, ordenadas por (data, id).
+
+    data é datetime64[D], valor são centavos int64, tipo é um código em
+    TIPOS e categoria é um código em categoria_ids/categoria_nomes. Cada
+    linha ocupa cerca de 30 bytes, contra centenas em tuplas de objetos.
+    """
+
+    def __init__(self, id, data, valor, tipo, categoria, categoria_ids, categoria_nomes):
+        self.id = id
+        self.data = data
+        self.valor = valor
+        self.tipo = tipo
+        self.categoria = categoria
+        self.categoria_ids = categoria_ids
+        self.categoria_nomes = categoria_nomes
+
+    @classmethod
+    def de_linhas(cls, linhas, nome_categoria):
+        """Monta o frame a partir de linhas no layout _LINHA, sem listas intermediárias.
+
+        nome_categoria(id) resolve o nome de cada categoria presente.
+        """
+        registros = np.fromiter(linhas, dtype=_LINHA)
+        categoria_ids, codigos = np.unique(registros['categoria_id'], return_inverse=True)
+        return cls(
+            id=registros['id'].copy(),
+            data=registros['dia'].astype('datetime64[D]'),
+            valor=registros['valor'].copy(),
+            tipo=registros['tipo'].copy(),
+            categoria=codigos.astype(np.int32),
+            categoria_ids=categoria_ids,
+            categoria_nomes=tuple(nome_categoria(int(cat_id)) for cat_id in categoria_ids),
+        )
+
+    def __len__(self):
+        return len(self.id)
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelas colunas, em bytes"""
+        return sum(coluna.nbytes for coluna in (self.id, self.data, self.valor, self.tipo, self.categoria))
+
+    def filtrar(self, mascara):
+        """Retorna um novo frame só com as linhas em que mascara é verdadeira"""
+        return TransactionFrame(
+            self.id[mascara], self.data[mascara], self.valor[mascara], self.tipo[mascara],
+            self.categoria[mascara], self.categoria_ids, self.categoria_nomes,
+        )
+
+    def valores_assinados(self):
+        """Valores em centavos com as saídas negativas"""
+        return np.where(self.tipo == SAIDA, -self.valor, self.valor)
+
+    def totais(self):
+        """Entradas, saídas, saldo e quantidades, no formato de Database.get_totais"""
+        entradas = self.tipo == ENTRADA
+        total_entradas = int(self.valor[entradas].sum())
+        total_saidas = int(self.valor[~entradas].sum())
+        return {
+            'entradas': total_entradas,
+            'saidas': total_saidas,
+            'saldo': total_entradas - total_saidas,
+            'qtd_entradas': int(entradas.sum()),
+            'qtd_saidas': int((~entradas).sum()),
+        }
+
+    def por_mes(self):
+        """Retorna (meses datetime64[M], entradas, saídas) somados por mês"""
+        meses = self.data.astype('datetime64[M]')
+        entradas = np.where(self.tipo == ENTRADA, self.valor, 0)
+        saidas = np.where(self.tipo == SAIDA, self.valor, 0)
+        unicos, soma_entradas = _somar_grupos(meses, entradas)
+        _, soma_saidas = _somar_grupos(meses, saidas)
+        return unicos, soma_entradas, soma_saidas
+
+    def fluxo_mensal(self):
+        """Linhas (mes 'AAAA-MM', entradas, saídas) dos últimos 12 meses, do mais recente, como em get_fluxo_mensal"""
+        meses, entradas, saidas = (coluna[::-1][:12] for coluna in self.por_mes())
+        return list(zip(meses.astype(str).tolist(), entradas.tolist(), saidas.tolist()))
+
+    def por_categoria(self, tipo=None):
+        """Retorna (nomes, totais) por categoria, opcionalmente de um só tipo"""
+        frame = self if tipo is None else self.filtrar(self.tipo == TIPOS.index(tipo))
+        ordem = np.argsort(frame.categoria, kind='stable')
+        codigos, totais = _somar_grupos(frame.categoria[ordem], frame.valor[ordem])
+        return [self.categoria_nomes[codigo] for codigo in codigos], totais
+
+    def saldo_acumulado(self, saldo_inicial=0):
+        """Saldo após cada transação, alinhado às linhas"""
+        return saldo_inicial + np.cumsum(self.valores_assinados())
+
+    def saldo_diario(self, saldo_inicial=0):
+        """Retorna (dias, saldo ao fim de cada dia com movimento)"""
+        dias, variacoes = _somar_grupos(self.data, self.valores_assinados())
+        return dias, saldo_inicial + np.cumsum(variacoes)